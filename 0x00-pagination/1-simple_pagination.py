@@ -3,11 +3,26 @@
 This module contains the `index_range` function which calculates start and end
 indexes for pagination parameters, and the `Server` class for paginating a
 database of popular baby names.
+
+The `Server` reads the CSV into memory by default; with `backend="columnar"`
+it instead memory-maps a columnar copy of the file (see `columnar_dataset`)
+and only builds the rows of the requested page, and with `backend="offset"` it
+seeks straight to the requested rows through a sidecar row-offset index (see
+`row_offset_index`) and parses only those lines. With `workers` > 1 the CSV
+backend parses the file on that many cores (see `parallel_csv`). Concurrent
+first calls load the dataset once: one thread reads it while the others wait
+for the result.
 """
 
 import csv
 import math
-from typing import List, Tuple
+import threading
+import time
+from typing import List, Sequence, Tuple
+
+from columnar_dataset import ColumnarDataset
+from parallel_csv import read_csv_parallel
+from row_offset_index import RowOffsetDataset
 
 
 def index_range(page: int, page_size: int) -> Tuple[int, int]:
@@ -30,21 +45,52 @@ class Server:
     """Server class to paginate a database of popular baby names.
     """
     DATA_FILE = "Popular_Baby_Names.csv"
-
-    def __init__(self):
+    BACKENDS = ("csv", "columnar", "offset")
+
+    def __init__(self, backend: str = "csv", workers: int = 1):
+        assert backend in self.BACKENDS, (
+            "Backend must be one of {}.".format(", ".join(self.BACKENDS)))
+        assert isinstance(workers, int) and workers > 0, (
+            "Workers must be an integer greater than 0.")
+        self.__backend = backend
+        self.__workers = workers
         self.__dataset = None
+        self.__load_lock = threading.Lock()
+        self.load_waits = 0
+        self.load_wait_seconds = 0.0
 
-    def dataset(self) -> List[List]:
+    def dataset(self) -> Sequence[List]:
         """Cached dataset
+
+        Loaded by a single thread; callers arriving during the load wait for
+        its result, and `load_waits` / `load_wait_seconds` count them and the
+        total time they spent waiting.
         """
         if self.__dataset is None:
-            with open(self.DATA_FILE) as f:
-                reader = csv.reader(f)
-                dataset = [row for row in reader]
-            self.__dataset = dataset[1:]
+            started = time.monotonic()
+            with self.__load_lock:
+                if self.__dataset is None:
+                    self.__dataset = self.__load()
+                else:
+                    self.load_waits += 1
+                    self.load_wait_seconds += time.monotonic() - started
 
         return self.__dataset
 
+    def __load(self) -> Sequence[List]:
+        """Read DATA_FILE with the configured backend
+        """
+        if self.__backend == "columnar":
+            return ColumnarDataset.from_csv(self.DATA_FILE)
+        if self.__backend == "offset":
+            return RowOffsetDataset.from_csv(self.DATA_FILE)
+        if self.__workers > 1:
+            return read_csv_parallel(self.DATA_FILE, self.__workers)[1:]
+        with open(self.DATA_FILE) as f:
+            reader = csv.reader(f)
+            dataset = [row for row in reader]
+        return dataset[1:]
+
     def get_page(self, page: int = 1, page_size: int = 10) -> List[List]:
         """
         Get a page from the dataset.
@@ -3,11 +3,48 @@
 This module contains the `index_range` function which calculates start and end
 indexes for pagination parameters, and the `Server` class for paginating a
 database of popular baby names.
+
+The `Server` reads the CSV into memory by default; with `backend="columnar"`
+it instead memory-maps a columnar copy of the file (see `columnar_dataset`)
+and only builds the rows of the requested page, and with `backend="offset"` it
+seeks straight to the requested rows through a sidecar row-offset index (see
+`row_offset_index`) and parses only those lines. With `workers` > 1 the CSV
+backend parses the file on that many cores (see `parallel_csv`), and with
+`snapshot=True` it keeps a binary snapshot of the parsed rows and their
+indexes next to the file so later starts skip parsing (see
+`dataset_snapshot`). Given a `schema` such as `BabyName`, rows are decoded
+into typed named tuples once, as they are loaded or built, instead of every
+consumer converting the numeric fields of every page it serves.
+
+Besides offset pages, `Server.get_cursor_page` serves keyset pages addressed by
+opaque cursors, which stay stable when rows are inserted and cost the same at
+any depth, and `Server.iter_pages` streams every page in a single pass for
+bulk exports. `get_page` and `get_hyper` also take a `where` filter answered
+from hash and sorted indexes on the columns, built the first time a column is
+filtered on. `get_hyper_json` serves pre-serialized envelopes from a bounded
+LRU cache keyed by page, page size and dataset version, and `Server.watch`
+reloads the data file in the background when it changes. Concurrent first
+calls load the dataset once: one thread reads it while the others wait.
 """
 
+import base64
+import bisect
 import csv
+import itertools
+import json
 import math
-from typing import List, Tuple, Dict
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import (Any, Callable, Iterator, List, NamedTuple, Sequence,
+                    Tuple, Type, Dict, Union, get_type_hints)
+
+from columnar_dataset import ColumnarDataset
+from dataset_snapshot import load_snapshot, save_snapshot
+from parallel_csv import read_csv_parallel
+from row_offset_index import RowOffsetDataset
 
 
 def index_range(page: int, page_size: int) -> Tuple[int, int]:
@@ -26,62 +63,429 @@ def index_range(page: int, page_size: int) -> Tuple[int, int]:
     return start_index, end_index
 
 
+def _freeze(value: Any) -> Any:
+    """Turn the lists JSON decodes tuples into back into tuples
+    """
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def encode_cursor(sort_value: Any, row_index: int,
+                  sort_tag: Union[int, str] = None) -> str:
+    """
+    Encode the position after a row as an opaque cursor.
+
+    Args:
+        sort_value (Any): The row's sort key; must be JSON serializable.
+        row_index (int): The row's index, which breaks ties between equal keys.
+        sort_tag (Union[int, str]): What the rows are sorted on (default is
+            None, the dataset order).
+
+    Returns:
+        str: A URL-safe cursor.
+    """
+    payload = json.dumps([sort_value, row_index, sort_tag],
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int, Union[int, str]]:
+    """
+    Decode a cursor made by `encode_cursor`.
+
+    Args:
+        cursor (str): The cursor.
+
+    Returns:
+        Tuple[Any, int, Union[int, str]]: The sort key and row index it
+            points after, and what the rows are sorted on.
+    """
+    padded = cursor + '=' * (-len(cursor) % 4)
+    sort_value, row_index, sort_tag = json.loads(
+        base64.urlsafe_b64decode(padded))
+    if not isinstance(row_index, int) or row_index < -1:
+        raise ValueError("Cursor row index must be an integer >= -1.")
+    return _freeze(sort_value), row_index, sort_tag
+
+
+def _sort_tag(sort_key: Union[int, Callable, None]) -> Union[int, str]:
+    """What a cursor records of the sort key it was made for
+    """
+    if sort_key is None or isinstance(sort_key, int):
+        return sort_key
+    return getattr(sort_key, '__qualname__', type(sort_key).__qualname__)
+
+
+class BabyName(NamedTuple):
+    """A row of Popular_Baby_Names.csv with its numeric fields decoded
+    """
+    year: int
+    gender: str
+    ethnicity: str
+    name: str
+    count: int
+    rank: int
+
+
+def row_decoder(schema: Type[NamedTuple]) -> Callable[[Sequence], Tuple]:
+    """
+    Build a function turning a row of fields into an instance of `schema`,
+    each field converted by the type annotated on it.
+
+    Args:
+        schema (Type[NamedTuple]): The row type, e.g. `BabyName`.
+
+    Returns:
+        Callable[[Sequence], Tuple]: The decoding function.
+    """
+    hints = get_type_hints(schema)
+    types = [hints[field] for field in schema._fields]
+    make = schema._make
+
+    def decode(row: Sequence) -> Tuple:
+        return make([kind(value) for kind, value in zip(types, row)])
+
+    return decode
+
+
+def _schema_key(schema: Type[NamedTuple]) -> Tuple:
+    """A description of a schema that snapshots can store and compare
+    """
+    if schema is None:
+        return None
+    hints = get_type_hints(schema)
+    return (schema.__name__,
+            tuple((field, hints[field].__name__) for field in schema._fields))
+
+
+class _Snapshot:
+    """A loaded dataset and the indexes derived from it.
+
+    Requests take the current snapshot once and use only it, so swapping in
+    a reloaded one never mixes rows and indexes of two versions of the file.
+    `filter_lock` guards the `filters` cache and `index_lock` the building
+    of indexes, so concurrent requests never build the same index twice.
+    """
+
+    def __init__(self, dataset: Sequence[List], version: int,
+                 signature: Tuple[int, int]):
+        self.dataset = dataset
+        self.version = version
+        self.signature = signature
+        self.sort_indexes = OrderedDict()
+        self.hash_indexes = {}
+        self.prefix_indexes = {}
+        self.filters = OrderedDict()
+        self.filter_lock = threading.Lock()
+        self.index_lock = threading.Lock()
+
+
 class Server:
     """Server class to paginate a database of popular baby names.
     """
     DATA_FILE = "Popular_Baby_Names.csv"
+    BACKENDS = ("csv", "columnar", "offset")
+    COLUMNS = {"year": 0, "gender": 1, "ethnicity": 2, "name": 3,
+               "count": 4, "rank": 5}
+    FILTER_CACHE_SIZE = 128
+    SORT_FUNCTION_CACHE_SIZE = 8
+    ENVELOPE_CACHE_SIZE = 1024
 
-    def __init__(self):
-        self.__dataset = None
+    def __init__(self, backend: str = "csv", workers: int = 1,
+                 snapshot: bool = False, schema: Type[NamedTuple] = None):
+        assert backend in self.BACKENDS, (
+            "Backend must be one of {}.".format(", ".join(self.BACKENDS)))
+        assert isinstance(workers, int) and workers > 0, (
+            "Workers must be an integer greater than 0.")
+        assert not snapshot or backend == "csv", (
+            "Snapshots are only kept for the csv backend.")
+        self.__backend = backend
+        self.__workers = workers
+        self.__persist = snapshot
+        self.__schema = schema
+        self.__decode = row_decoder(schema) if schema is not None else None
+        self.__snapshot = None
+        self.__version = 0
+        self.__envelopes = OrderedDict()
+        self.__envelope_lock = threading.Lock()
+        self.__watcher = None
+        self.reload_error = None
+        self.__load_lock = threading.Lock()
+        self.load_waits = 0
+        self.load_wait_seconds = 0.0
 
-    def dataset(self) -> List[List]:
+    def dataset(self) -> Sequence[List]:
         """Cached dataset
+
+        Loaded by a single thread; callers arriving during the load wait for
+        its result, and `load_waits` / `load_wait_seconds` count them and the
+        total time they spent waiting.
+        """
+        return self.__current().dataset
+
+    def __current(self) -> _Snapshot:
+        """The snapshot requests are served from, loaded on first use
         """
-        if self.__dataset is None:
+        if self.__snapshot is None:
+            started = time.monotonic()
+            with self.__load_lock:
+                if self.__snapshot is None:
+                    self.__snapshot = self.__load()
+                else:
+                    self.load_waits += 1
+                    self.load_wait_seconds += time.monotonic() - started
+        return self.__snapshot
+
+    def __load(self) -> _Snapshot:
+        """Read DATA_FILE with the configured backend into a new snapshot
+        """
+        st = os.stat(self.DATA_FILE)
+        signature = (st.st_size, st.st_mtime_ns)
+        saved = None
+        if self.__backend == "columnar":
+            dataset = ColumnarDataset.from_csv(self.DATA_FILE,
+                                               row_factory=self.__decode)
+        elif self.__backend == "offset":
+            dataset = RowOffsetDataset.from_csv(self.DATA_FILE,
+                                                row_factory=self.__decode)
+        elif self.__persist:
+            schema_key = _schema_key(self.__schema)
+            saved = load_snapshot(self.DATA_FILE, schema=schema_key)
+            if saved is not None:
+                dataset = saved['rows']
+                if self.__schema is not None:
+                    dataset = [self.__schema._make(row) for row in dataset]
+            else:
+                dataset = self.__parse()
+                save_snapshot(self.DATA_FILE, signature,
+                              self.__plain_rows(dataset), schema=schema_key)
+        else:
+            dataset = self.__parse()
+        self.__version += 1
+        snapshot = _Snapshot(dataset, self.__version, signature)
+        if saved is not None:
+            self.__restore_indexes(snapshot, saved['indexes'])
+        return snapshot
+
+    def __parse(self) -> List[List]:
+        """Parse DATA_FILE into a list of rows, on `workers` cores
+        """
+        if self.__workers > 1:
+            dataset = read_csv_parallel(self.DATA_FILE, self.__workers)
+        else:
             with open(self.DATA_FILE) as f:
                 reader = csv.reader(f)
                 dataset = [row for row in reader]
-            self.__dataset = dataset[1:]
+        if self.__decode is not None:
+            return [self.__decode(row) for row in dataset[1:]]
+        return dataset[1:]
+
+    def __plain_rows(self, dataset: List) -> List:
+        """Rows as `marshal` can store them: typed rows become plain tuples
+        """
+        if self.__schema is None:
+            return dataset
+        return [tuple(row) for row in dataset]
+
+    def write_snapshot(self) -> bool:
+        """
+        Save the current dataset with every index built on it so far, so
+        the next start with `snapshot=True` begins with them already built.
+
+        Sort indexes on a function of the row cannot be saved and are
+        skipped.
+
+        Returns:
+            bool: True if written, False if DATA_FILE changed since it was
+                loaded.
+        """
+        assert self.__persist, "Server must be created with snapshot=True."
+        snapshot = self.__current()
+        indexes = {
+            'hash': {
+                column: {value: rows.tobytes()
+                         for value, rows in index.items()}
+                for column, index in list(snapshot.hash_indexes.items())
+            },
+            'prefix': {
+                column: (fields, rows.tobytes())
+                for column, (fields, rows) in
+                list(snapshot.prefix_indexes.items())
+            },
+            'sort': {
+                sort_key: entries
+                for sort_key, entries in list(snapshot.sort_indexes.items())
+                if isinstance(sort_key, int)
+            },
+        }
+        return save_snapshot(self.DATA_FILE, snapshot.signature,
+                             self.__plain_rows(snapshot.dataset), indexes,
+                             schema=_schema_key(self.__schema))
+
+    def __restore_indexes(self, snapshot: _Snapshot, indexes: Dict) -> None:
+        """Put indexes saved by `write_snapshot` back on a snapshot
+        """
+        for column, index in indexes.get('hash', {}).items():
+            snapshot.hash_indexes[column] = {}
+            for value, rows in index.items():
+                snapshot.hash_indexes[column][value] = array('q')
+                snapshot.hash_indexes[column][value].frombytes(rows)
+        for column, (fields, rows) in indexes.get('prefix', {}).items():
+            snapshot.prefix_indexes[column] = (fields, array('q'))
+            snapshot.prefix_indexes[column][1].frombytes(rows)
+        snapshot.sort_indexes.update(indexes.get('sort', {}))
 
-        return self.__dataset
+    def reload(self) -> bool:
+        """
+        Load DATA_FILE again if its size or mtime changed since it was loaded.
+
+        The new dataset, and every index the current one had built except
+        the sort indexes on a function of the row, are built before being
+        swapped in at once; requests already running finish against the
+        snapshot they started with.
+
+        Returns:
+            bool: True if a new snapshot was swapped in.
+        """
+        with self.__load_lock:
+            current = self.__snapshot
+            if current is None:
+                return False
+            st = os.stat(self.DATA_FILE)
+            if (st.st_size, st.st_mtime_ns) == current.signature:
+                return False
+
+            snapshot = self.__load()
+            for column in list(current.hash_indexes):
+                self.__hash_index(snapshot, column)
+            for column in list(current.prefix_indexes):
+                self.__prefix_index(snapshot, column)
+            for sort_key in list(current.sort_indexes):
+                if isinstance(sort_key, int):
+                    self.__sort_index(snapshot, sort_key)
+            self.__snapshot = snapshot
+            with self.__envelope_lock:
+                self.__envelopes.clear()
+        return True
 
-    def get_page(self, page: int = 1, page_size: int = 10) -> List[List]:
+    def watch(self, interval: float = 1.0) -> None:
+        """
+        Start a background thread calling `reload` every `interval` seconds.
+
+        A file that cannot be read, parsed or indexed (e.g. while it is
+        being rewritten in place) is retried on the next tick while requests
+        keep being served from the current snapshot; the error is kept in
+        `reload_error` until a reload succeeds. Replace the file atomically
+        (write then rename) to avoid reading it half written.
+
+        Args:
+            interval (float): Seconds between two checks (default is 1.0).
+        """
+        assert interval > 0, "Interval must be greater than 0."
+        if self.__watcher is not None:
+            return
+        stop = threading.Event()
+        thread = threading.Thread(target=self.__watch, args=(interval, stop),
+                                  name="pagination-reload", daemon=True)
+        self.__watcher = (thread, stop)
+        thread.start()
+
+    def stop_watching(self) -> None:
+        """Stop the thread started by `watch`
+        """
+        if self.__watcher is None:
+            return
+        thread, stop = self.__watcher
+        self.__watcher = None
+        stop.set()
+        thread.join()
+
+    def __watch(self, interval: float, stop: threading.Event) -> None:
+        """Reload loop run by the watcher thread
+        """
+        while not stop.wait(interval):
+            try:
+                self.reload()
+            except Exception as error:
+                self.reload_error = error
+            else:
+                self.reload_error = None
+
+    def get_page(self, page: int = 1, page_size: int = 10,
+                 where: Dict = None) -> List[List]:
         """
         Get a page from the dataset.
 
         Args:
             page (int): The page number (default is 1).
             page_size (int): The number of items per page (default is 10).
+            where (Dict): Only page through rows matching every condition
+                (default is None, all rows); see `filter_rows`.
 
         Returns:
             List[List]: A list of rows corresponding to the specified page.
         """
+        snapshot = self.__current()
+        matches = None
+        if where is not None:
+            matches = self.__filter(snapshot, where)
+        return self.__page(snapshot, page, page_size, matches)
+
+    def __page(self, snapshot: _Snapshot, page: int, page_size: int,
+               matches: Sequence[int]) -> List[List]:
+        """`get_page` against a given snapshot, paging through the rows of
+        `matches` if it is not None
+        """
         assert isinstance(page, int) and page > 0, (
             "Page must be an integer greater than 0.")
         assert isinstance(page_size, int) and page_size > 0, (
             "Page size must be an integer greater than 0.")
 
         start_index, end_index = index_range(page, page_size)
-        dataset = self.dataset()
+        dataset = snapshot.dataset
+
+        if matches is not None:
+            return [dataset[i] for i in matches[start_index:end_index]]
 
         if start_index >= len(dataset):
             return []
 
         return dataset[start_index:end_index]
 
-    def get_hyper(self, page: int = 1, page_size: int = 10) -> Dict:
+    def get_hyper(self, page: int = 1, page_size: int = 10,
+                  where: Dict = None) -> Dict:
         """
         Get a dictionary with hypermedia pagination details.
 
         Args:
             page (int): The page number (default is 1).
             page_size (int): The number of items per page (default is 10).
+            where (Dict): Only page through rows matching every condition
+                (default is None, all rows); see `filter_rows`.
 
         Returns:
             Dict: A dictionary with pagination details.
         """
-        data = self.get_page(page, page_size)
-        total_items = len(self.dataset())
+        return self.__hyper(self.__current(), page, page_size, where)
+
+    def __hyper(self, snapshot: _Snapshot, page: int, page_size: int,
+                where: Dict) -> Dict:
+        """`get_hyper` against a given snapshot
+        """
+        matches = None
+        total_items = len(snapshot.dataset)
+        if where is not None:
+            matches = self.__filter(snapshot, where)
+            total_items = len(matches)
+        data = self.__page(snapshot, page, page_size, matches)
+        return self.__envelope(page, page_size, data, total_items)
+
+    @staticmethod
+    def __envelope(page: int, page_size: int, data: List[List],
+                   total_items: int) -> Dict:
+        """The `get_hyper` dictionary of a page
+        """
         total_pages = math.ceil(total_items / page_size)
         next_page = page + 1 if page < total_pages else None
         prev_page = page - 1 if page > 1 else None
@@ -94,3 +498,352 @@ class Server:
             'prev_page': prev_page,
             'total_pages': total_pages
         }
+
+    def get_pages(self, pages: List[Tuple[int, int]],
+                  where: Dict = None) -> List[Dict]:
+        """
+        Get the `get_hyper` dictionaries of several pages in one pass.
+
+        Every page is read from the same version of the dataset, whose size
+        (or filter) is computed once, and overlapping or adjacent pages are
+        read as a single slice, so prefetching the next few pages costs
+        about as much as fetching one large page.
+
+        Args:
+            pages (List[Tuple[int, int]]): The (page, page_size) of each
+                page wanted.
+            where (Dict): Only page through rows matching every condition
+                (default is None, all rows); see `filter_rows`.
+
+        Returns:
+            List[Dict]: The pagination details of each page, in order.
+        """
+        snapshot = self.__current()
+        dataset = snapshot.dataset
+        if where is not None:
+            matches = self.__filter(snapshot, where)
+            total_items = len(matches)
+        else:
+            total_items = len(dataset)
+
+        spans = []
+        for page, page_size in pages:
+            assert isinstance(page, int) and page > 0, (
+                "Page must be an integer greater than 0.")
+            assert isinstance(page_size, int) and page_size > 0, (
+                "Page size must be an integer greater than 0.")
+            start, end = index_range(page, page_size)
+            spans.append((min(start, total_items), min(end, total_items)))
+        if where is None and isinstance(dataset, list):
+            # Slicing an in-memory list is already as cheap as it gets.
+            return [self.__envelope(page, page_size, dataset[start:end],
+                                    total_items)
+                    for (page, page_size), (start, end) in zip(pages, spans)]
+
+        # Merge the requested ranges, then read each merged range once.
+        blocks = []
+        for start, end in sorted(spans):
+            if blocks and start <= blocks[-1][1]:
+                blocks[-1][1] = max(blocks[-1][1], end)
+            else:
+                blocks.append([start, end])
+        starts = [start for start, _ in blocks]
+        if where is not None:
+            rows = [[dataset[i] for i in matches[start:end]]
+                    for start, end in blocks]
+        else:
+            rows = [dataset[start:end] for start, end in blocks]
+
+        results = []
+        for (page, page_size), (start, end) in zip(pages, spans):
+            block = bisect.bisect_right(starts, start) - 1
+            offset = start - starts[block]
+            data = rows[block][offset:offset + end - start]
+            results.append(
+                self.__envelope(page, page_size, data, total_items))
+        return results
+
+    def get_hyper_json(self, page: int = 1, page_size: int = 10) -> bytes:
+        """
+        Get the `get_hyper` envelope of a page serialized as JSON.
+
+        Envelopes are cached by (page, page_size, dataset version) in a
+        bounded LRU cache, so hot pages are served without being rebuilt and
+        a reloaded dataset never serves stale pages.
+
+        Args:
+            page (int): The page number (default is 1).
+            page_size (int): The number of items per page (default is 10).
+
+        Returns:
+            bytes: The UTF-8 encoded JSON envelope.
+        """
+        snapshot = self.__current()
+        key = (page, page_size, snapshot.version)
+        with self.__envelope_lock:
+            payload = self.__envelopes.get(key)
+            if payload is not None:
+                self.__envelopes.move_to_end(key)
+                return payload
+
+        envelope = self.__hyper(snapshot, page, page_size, None)
+        payload = json.dumps(envelope).encode('utf-8')
+        with self.__envelope_lock:
+            self.__envelopes[key] = payload
+            if len(self.__envelopes) > self.ENVELOPE_CACHE_SIZE:
+                self.__envelopes.popitem(last=False)
+        return payload
+
+    def iter_pages(self, page_size: int = 10,
+                   start_page: int = 1) -> Iterator[List[List]]:
+        """
+        Stream the pages of the dataset in order, in a single pass.
+
+        Pages are produced only as the caller asks for the next one, so a
+        slow consumer simply holds the reader back. If the dataset has not
+        been loaded, the CSV is streamed straight from the file and at most
+        one page of rows is held in memory.
+
+        Args:
+            page_size (int): The number of items per page (default is 10).
+            start_page (int): The first page to produce (default is 1).
+
+        Yields:
+            List[List]: The rows of each page, the last one possibly short.
+        """
+        assert isinstance(page_size, int) and page_size > 0, (
+            "Page size must be an integer greater than 0.")
+        assert isinstance(start_page, int) and start_page > 0, (
+            "Start page must be an integer greater than 0.")
+
+        start_index, _ = index_range(start_page, page_size)
+        if self.__snapshot is None and self.__backend == "csv":
+            with open(self.DATA_FILE) as f:
+                reader = csv.reader(f)
+                rows = itertools.islice(reader, start_index + 1, None)
+                if self.__decode is not None:
+                    rows = map(self.__decode, rows)
+                page = list(itertools.islice(rows, page_size))
+                while page:
+                    yield page
+                    page = list(itertools.islice(rows, page_size))
+            return
+
+        dataset = self.dataset()
+        for offset in range(start_index, len(dataset), page_size):
+            yield dataset[offset:offset + page_size]
+
+    def filter_rows(self, where: Dict) -> Sequence[int]:
+        """
+        Get the indexes of the rows matching every condition of `where`.
+
+        A key naming a column of `COLUMNS` matches rows whose field equals
+        the value, through a hash index on that column; a key of the form
+        "<column>_prefix" matches rows whose field starts with the value,
+        through a sorted index. Indexes are built the first time a column is
+        filtered on and recent prefix and multi-column results are cached.
+
+        Args:
+            where (Dict): The conditions, e.g. {"year": "2016",
+                "name_prefix": "Ol"}.
+
+        Returns:
+            Sequence[int]: The matching row indexes, in dataset order, as a
+                read-only view of the cached result.
+        """
+        return memoryview(self.__filter(self.__current(), where)).toreadonly()
+
+    def __filter(self, snapshot: _Snapshot, where: Dict) -> Sequence[int]:
+        """`filter_rows` against a given snapshot
+        """
+        assert isinstance(where, dict) and where, (
+            "Where must be a non-empty dictionary.")
+        conditions = []
+        for key, value in where.items():
+            column = key[:-len("_prefix")] if key.endswith("_prefix") else key
+            assert column in self.COLUMNS, (
+                "Where keys must be one of {} or end in _prefix.".format(
+                    ", ".join(self.COLUMNS)))
+            conditions.append((key, value, column != key,
+                               self.COLUMNS[column]))
+
+        if len(conditions) == 1 and not conditions[0][2]:
+            return self.__matches(snapshot, *conditions[0][1:])
+
+        cache_key = tuple(sorted((key, repr(value))
+                                 for key, value, _, _ in conditions))
+        filters = snapshot.filters
+        with snapshot.filter_lock:
+            rows = filters.get(cache_key)
+            if rows is not None:
+                filters.move_to_end(cache_key)
+                return rows
+
+        matches = sorted((self.__matches(snapshot, *condition[1:])
+                          for condition in conditions), key=len)
+        rows = matches[0]
+        if len(matches) > 1:
+            rows = array('q', sorted(set(rows).intersection(*matches[1:])))
+        with snapshot.filter_lock:
+            filters[cache_key] = rows
+            if len(filters) > self.FILTER_CACHE_SIZE:
+                filters.popitem(last=False)
+        return rows
+
+    def __matches(self, snapshot: _Snapshot, value: Any, prefix: bool,
+                  column: int) -> Sequence[int]:
+        """Row indexes matching one condition, from the column's index
+        """
+        if not prefix:
+            return self.__hash_index(snapshot, column).get(value, array('q'))
+
+        fields, rows = self.__prefix_index(snapshot, column)
+        value = str(value)
+        low = bisect.bisect_left(fields, value)
+        high = len(fields)
+        if value:
+            upper = value[:-1] + chr(ord(value[-1]) + 1)
+            high = bisect.bisect_left(fields, upper, low)
+        return array('q', sorted(rows[low:high]))
+
+    def __hash_index(self, snapshot: _Snapshot, column: int) -> Dict:
+        """Row indexes of each value of a column, built once per snapshot
+        """
+        index = snapshot.hash_indexes.get(column)
+        if index is not None:
+            return index
+        with snapshot.index_lock:
+            if column not in snapshot.hash_indexes:
+                index = {}
+                for i, row in enumerate(self.__rows(snapshot)):
+                    index.setdefault(row[column], array('q')).append(i)
+                snapshot.hash_indexes[column] = index
+            return snapshot.hash_indexes[column]
+
+    def __prefix_index(self, snapshot: _Snapshot,
+                       column: int) -> Tuple[List[str], Sequence[int]]:
+        """A column's sorted values and their row indexes, built once per
+        snapshot
+        """
+        index = snapshot.prefix_indexes.get(column)
+        if index is not None:
+            return index
+        with snapshot.index_lock:
+            if column not in snapshot.prefix_indexes:
+                entries = sorted(
+                    (str(row[column]), i)
+                    for i, row in enumerate(self.__rows(snapshot)))
+                snapshot.prefix_indexes[column] = (
+                    [field for field, _ in entries],
+                    array('q', (i for _, i in entries)))
+            return snapshot.prefix_indexes[column]
+
+    def __rows(self, snapshot: _Snapshot,
+               chunk_size: int = 10000) -> Iterator[List]:
+        """Iterate over the dataset in slices, whatever the backend
+        """
+        dataset = snapshot.dataset
+        for start in range(0, len(dataset), chunk_size):
+            yield from dataset[start:start + chunk_size]
+
+    def __sort_index(self, snapshot: _Snapshot,
+                     sort_key: Union[int, Callable]) -> List[Tuple]:
+        """(sort key, row index) of every row in sort order, built once per key
+
+        Only the SORT_FUNCTION_CACHE_SIZE functions used last keep their
+        index, the least recently used one being dropped first.
+        """
+        if isinstance(sort_key, int):
+            index = snapshot.sort_indexes.get(sort_key)
+            if index is not None:
+                return index
+        with snapshot.index_lock:
+            index = snapshot.sort_indexes.get(sort_key)
+            if index is not None:
+                snapshot.sort_indexes.move_to_end(sort_key)
+                return index
+            if isinstance(sort_key, int):
+                column = sort_key
+                sort_key_function = (lambda row: row[column])
+            else:
+                sort_key_function = sort_key
+                functions = [key for key in snapshot.sort_indexes
+                             if not isinstance(key, int)]
+                if len(functions) >= self.SORT_FUNCTION_CACHE_SIZE:
+                    del snapshot.sort_indexes[functions[0]]
+            index = sorted((sort_key_function(row), i)
+                           for i, row in enumerate(self.__rows(snapshot)))
+            snapshot.sort_indexes[sort_key] = index
+            return index
+
+    def get_cursor_page(self, cursor: str = None, page_size: int = 10,
+                        sort_key: Union[int, Callable] = None) -> Dict:
+        """
+        Get a page of rows that come after a cursor (keyset pagination).
+
+        Each page costs O(log n + page_size) however deep it is, and a cursor
+        keeps pointing after the same row when rows are inserted.
+
+        Args:
+            cursor (str): The `next_cursor` of the previous page (default is
+                None, the first page).
+            page_size (int): The number of items per page (default is 10).
+            sort_key (Union[int, Callable]): The column index, or a function
+                of the row, to sort on (default is None, the dataset order).
+                Keys must be JSON serializable. Sort indexes are cached per
+                function object, so pass the same function for every page
+                rather than a new lambda.
+
+        Returns:
+            Dict: A dictionary with the page and the cursor of the next one.
+        """
+        assert isinstance(page_size, int) and page_size > 0, (
+            "Page size must be an integer greater than 0.")
+        assert sort_key is None or isinstance(sort_key, int) or (
+            callable(sort_key)), (
+            "Sort key must be a column index or a function of the row.")
+
+        after = None
+        if cursor is not None:
+            try:
+                after = decode_cursor(cursor)
+            except (ValueError, TypeError):
+                pass
+            assert after is not None and after[2] == _sort_tag(sort_key), (
+                "Cursor must be a next_cursor returned by get_cursor_page.")
+
+        snapshot = self.__current()
+        dataset = snapshot.dataset
+        if sort_key is None:
+            start = after[1] + 1 if after else 0
+            entries = [(None, i) for i in
+                       range(start, min(start + page_size, len(dataset)))]
+            has_more = start + page_size < len(dataset)
+        else:
+            sort_index = self.__sort_index(snapshot, sort_key)
+            start = 0
+            if after:
+                try:
+                    start = bisect.bisect_right(sort_index, after[:2])
+                except TypeError:
+                    start = None
+                assert start is not None, (
+                    "Cursor must be a next_cursor returned by "
+                    "get_cursor_page.")
+            entries = sort_index[start:start + page_size]
+            has_more = start + page_size < len(sort_index)
+
+        if sort_key is None and entries:
+            data = dataset[entries[0][1]:entries[-1][1] + 1]
+        else:
+            data = [dataset[i] for _, i in entries]
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor(*entries[-1], _sort_tag(sort_key))
+
+        return {
+            'cursor': cursor,
+            'page_size': len(data),
+            'data': data,
+            'next_cursor': next_cursor
+        }
@@ -1,11 +1,24 @@
 #!/usr/bin/env python3
 """
 Deletion-resilient hypermedia pagination
+
+Rows are indexed by an `IndexedDataset` whose deletions are tracked by a
+`LiveIndex` (see `live_index`), so a page is found in O(page_size + log n)
+however many rows before it were deleted. Concurrent first calls load the
+dataset and its index once: one thread builds each while the others wait.
+With `workers` > 1 the CSV is parsed on that many cores (see `parallel_csv`).
+`Server.get_hyper_index_batch` answers several page requests in one pass.
 """
 
+import bisect
 import csv
 import math
-from typing import List, Dict
+import threading
+import time
+from typing import List, Dict, Mapping, Tuple
+
+from live_index import IndexedDataset
+from parallel_csv import read_csv_parallel
 
 
 class Server:
@@ -13,31 +26,70 @@ class Server:
     """
     DATA_FILE = "Popular_Baby_Names.csv"
 
-    def __init__(self):
+    def __init__(self, workers: int = 1):
+        assert isinstance(workers, int) and workers > 0, (
+            "Workers must be an integer greater than 0.")
+        self.__workers = workers
         self.__dataset = None
         self.__indexed_dataset = None
+        self.__dataset_lock = threading.Lock()
+        self.__index_lock = threading.Lock()
+        self.load_waits = 0
+        self.load_wait_seconds = 0.0
 
     def dataset(self) -> List[List]:
         """Cached dataset
+
+        Loaded by a single thread; callers arriving during the load wait for
+        its result, and `load_waits` / `load_wait_seconds` count them and the
+        total time they spent waiting.
         """
         if self.__dataset is None:
-            with open(self.DATA_FILE) as f:
-                reader = csv.reader(f)
-                dataset = [row for row in reader]
-            self.__dataset = dataset[1:]
+            started = time.monotonic()
+            with self.__dataset_lock:
+                if self.__dataset is None and self.__workers > 1:
+                    self.__dataset = read_csv_parallel(
+                        self.DATA_FILE, self.__workers)[1:]
+                elif self.__dataset is None:
+                    with open(self.DATA_FILE) as f:
+                        reader = csv.reader(f)
+                        dataset = [row for row in reader]
+                    self.__dataset = dataset[1:]
+                else:
+                    self.__waited(started)
 
         return self.__dataset
 
-    def indexed_dataset(self) -> Dict[int, List]:
+    def indexed_dataset(self) -> Mapping[int, List]:
         """Dataset indexed by sorting position, starting at 0
         """
         if self.__indexed_dataset is None:
-            dataset = self.dataset()
-            self.__indexed_dataset = {
-                i: dataset[i] for i in range(len(dataset))
-            }
+            started = time.monotonic()
+            with self.__index_lock:
+                if self.__indexed_dataset is None:
+                    self.__indexed_dataset = IndexedDataset(self.dataset())
+                else:
+                    self.__waited(started)
         return self.__indexed_dataset
 
+    def __waited(self, started: float) -> None:
+        """Count a caller that waited on another thread's load
+        """
+        self.load_waits += 1
+        self.load_wait_seconds += time.monotonic() - started
+
+    def delete(self, index: int) -> None:
+        """
+        Delete a row in O(log n), keeping later pages in sync.
+
+        Args:
+            index (int): The index of the row to delete.
+        """
+        indexed_dataset = self.indexed_dataset()
+        assert index in indexed_dataset, (
+            "Index must be the index of a row that is not deleted.")
+        del indexed_dataset[index]
+
     def get_hyper_index(self, index: int = None, page_size: int = 10) -> Dict:
         """
         Get a dictionary with deletion-resilient hypermedia pagination details.
@@ -55,16 +107,15 @@ class Server:
             "Page size must be a positive integer.")
 
         indexed_dataset = self.indexed_dataset()
-        assert index < len(indexed_dataset), (
+        assert index < indexed_dataset.size, (
             "Index out of range.")
 
-        data = []
-        next_index = index
-
-        while len(data) < page_size and next_index < len(indexed_dataset):
-            if next_index in indexed_dataset:
-                data.append(indexed_dataset[next_index])
-            next_index += 1
+        rows = indexed_dataset.live_index.live_from(index, page_size)
+        data = [indexed_dataset.rows[row] for row in rows]
+        if len(rows) == page_size:
+            next_index = rows[-1] + 1
+        else:
+            next_index = indexed_dataset.size
 
         return {
             'index': index,
@@ -72,3 +123,67 @@ class Server:
             'page_size': len(data),
             'next_index': next_index
         }
+
+    def get_hyper_index_batch(
+            self, requests: List[Tuple[int, int]]) -> List[Dict]:
+        """
+        Get the `get_hyper_index` dictionaries of several pages in one pass.
+
+        Requests are answered in index order from a window of the live rows
+        found so far: a page overlapping or following the previous one
+        reuses its rows and only looks up the live rows past its end, so
+        each run of deleted rows between them is skipped once.
+
+        Args:
+            requests (List[Tuple[int, int]]): The (index, page_size) of each
+                page wanted.
+
+        Returns:
+            List[Dict]: The pagination details of each page, in order.
+        """
+        for index, page_size in requests:
+            assert isinstance(index, int) and index >= 0, (
+                "Index must be a non-negative integer.")
+            assert isinstance(page_size, int) and page_size > 0, (
+                "Page size must be a positive integer.")
+
+        indexed_dataset = self.indexed_dataset()
+        live_index = indexed_dataset.live_index
+        size = indexed_dataset.size
+        for index, _ in requests:
+            assert index < size, (
+                "Index out of range.")
+
+        # Every live row from window_start to window[-1] is in window.
+        window_start, window = 0, []
+        pages = {}
+        for index, page_size in sorted(set(requests)):
+            if window and window_start <= index <= window[-1]:
+                position = bisect.bisect_left(window, index)
+                rows = window[position:position + page_size]
+                if len(rows) < page_size:
+                    more = live_index.live_from(window[-1] + 1,
+                                                page_size - len(rows))
+                    window.extend(more)
+                    rows += more
+            else:
+                rows = live_index.live_from(index, page_size)
+                window_start, window = index, list(rows)
+            pages[index, page_size] = rows
+
+        results = []
+        for index, page_size in requests:
+            rows = pages[index, page_size]
+            data = [indexed_dataset.rows[row] for row in rows]
+            if len(rows) == page_size:
+                next_index = rows[-1] + 1
+            else:
+                next_index = size
+
+            results.append({
+                'index': index,
+                'data': data,
+                'page_size': len(data),
+                'next_index': next_index
+            })
+        return results
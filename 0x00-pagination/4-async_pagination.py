@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Asyncio pagination
+
+`AsyncServer` serves the pages of `Server` (see `2-hypermedia_pagination`)
+and the deletion-resilient pages of `3-hypermedia_del_pagination` to
+coroutines without ever blocking the event loop: the dataset is loaded in an
+executor, and all the coroutines awaiting it during the load share a single
+future. Once loaded, in-memory pages are sliced directly on the loop, while
+pages needing file reads or index builds are served from the executor.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Type
+
+from live_index import IndexedDataset
+
+Server = __import__('2-hypermedia_pagination').Server
+
+
+class AsyncServer:
+    """Asyncio server class to paginate a database of popular baby names.
+    """
+
+    def __init__(self, backend: str = "csv", workers: int = 1,
+                 snapshot: bool = False, schema: Type[NamedTuple] = None,
+                 executor: Executor = None):
+        self.__server = Server(backend, workers, snapshot, schema)
+        self.__in_memory = backend == "csv"
+        self.__executor = executor
+        self.__loads = {}
+        self.load_waits = 0
+        self.load_wait_seconds = 0.0
+
+    @property
+    def server(self) -> Server:
+        """The synchronous `Server` the pages are read from"""
+        return self.__server
+
+    async def __once(self, name: str, function: Callable) -> Any:
+        """
+        Run `function` in the executor once, however many coroutines ask for
+        its result while it runs.
+
+        A failed run is forgotten so the next caller tries again; a caller
+        being cancelled does not cancel the run the others are waiting on.
+        """
+        future = self.__loads.get(name)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.__executor, function)
+            future.add_done_callback(lambda done: self.__forget(name, done))
+            self.__loads[name] = future
+            return await asyncio.shield(future)
+
+        if future.done():
+            return future.result()
+        started = time.monotonic()
+        self.load_waits += 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self.load_wait_seconds += time.monotonic() - started
+
+    def __forget(self, name: str, future: asyncio.Future) -> None:
+        """Drop a failed run so that it is retried
+        """
+        if future.cancelled() or future.exception() is not None:
+            if self.__loads.get(name) is future:
+                del self.__loads[name]
+
+    async def dataset(self) -> List[List]:
+        """Cached dataset, loaded in the executor on first use
+        """
+        return await self.__once('dataset', self.__server.dataset)
+
+    async def indexed_dataset(self) -> Mapping[int, List]:
+        """Dataset indexed by sorting position, starting at 0
+        """
+        dataset = await self.dataset()
+        return await self.__once('index', lambda: IndexedDataset(dataset))
+
+    async def __serve(self, function: Callable, *args) -> Any:
+        """Call `function` on the loop if it only reads memory, otherwise in
+        the executor
+        """
+        await self.dataset()
+        if self.__in_memory:
+            return function(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, function, *args)
+
+    async def get_page(self, page: int = 1, page_size: int = 10,
+                       where: Dict = None) -> List[List]:
+        """
+        Get a page from the dataset.
+
+        Args:
+            page (int): The page number (default is 1).
+            page_size (int): The number of items per page (default is 10).
+            where (Dict): Only page through rows matching every condition
+                (default is None, all rows); see `Server.filter_rows`.
+
+        Returns:
+            List[List]: A list of rows corresponding to the specified page.
+        """
+        if where is not None:
+            await self.dataset()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.__executor, self.__server.get_page, page, page_size,
+                where)
+        return await self.__serve(self.__server.get_page, page, page_size)
+
+    async def get_hyper(self, page: int = 1, page_size: int = 10,
+                        where: Dict = None) -> Dict:
+        """
+        Get a dictionary with hypermedia pagination details.
+
+        Args:
+            page (int): The page number (default is 1).
+            page_size (int): The number of items per page (default is 10).
+            where (Dict): Only page through rows matching every condition
+                (default is None, all rows); see `Server.filter_rows`.
+
+        Returns:
+            Dict: A dictionary with pagination details.
+        """
+        if where is not None:
+            await self.dataset()
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self.__executor, self.__server.get_hyper, page, page_size,
+                where)
+        return await self.__serve(self.__server.get_hyper, page, page_size)
+
+    async def delete(self, index: int) -> None:
+        """
+        Delete a row in O(log n), keeping later pages in sync.
+
+        Args:
+            index (int): The index of the row to delete.
+        """
+        indexed_dataset = await self.indexed_dataset()
+        assert index in indexed_dataset, (
+            "Index must be the index of a row that is not deleted.")
+        del indexed_dataset[index]
+
+    async def get_hyper_index(self, index: int = None,
+                              page_size: int = 10) -> Dict:
+        """
+        Get a dictionary with deletion-resilient hypermedia pagination details.
+
+        Args:
+            index (int): The start index of the return page.
+            page_size (int): The number of items per page (default is 10).
+
+        Returns:
+            Dict: A dictionary with pagination details.
+        """
+        assert isinstance(index, int) and index >= 0, (
+            "Index must be a non-negative integer.")
+        assert isinstance(page_size, int) and page_size > 0, (
+            "Page size must be a positive integer.")
+
+        indexed_dataset = await self.indexed_dataset()
+        assert index < indexed_dataset.size, (
+            "Index out of range.")
+
+        rows = indexed_dataset.live_index.live_from(index, page_size)
+        if self.__in_memory:
+            data = [indexed_dataset.rows[row] for row in rows]
+        else:
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(
+                self.__executor,
+                lambda: [indexed_dataset.rows[row] for row in rows])
+        if len(rows) == page_size:
+            next_index = rows[-1] + 1
+        else:
+            next_index = indexed_dataset.size
+
+        return {
+            'index': index,
+            'data': data,
+            'page_size': len(data),
+            'next_index': next_index
+        }
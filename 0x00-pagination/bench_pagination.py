@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the pagination servers, run against a synthetic copy of
+`Popular_Baby_Names.csv`.
+
+    ./bench_pagination.py load --rows 2000000 --workers 1 2 4 8
+    ./bench_pagination.py async --rows 1000000 --clients 1000
+    ./bench_pagination.py suite --rows 10000 1000000 --deleted 0 0.5 \
+        --output results.json --compare baseline.json
+
+The `suite` command runs every case in a fresh worker process and writes
+machine-readable results; with `--compare` it exits with status 1 when a
+case is slower than the baseline by more than `--tolerance`.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple
+
+from parallel_csv import read_csv_parallel
+
+index_range = __import__('2-hypermedia_pagination').index_range
+Server = __import__('2-hypermedia_pagination').Server
+DelServer = __import__('3-hypermedia_del_pagination').Server
+AsyncServer = __import__('4-async_pagination').AsyncServer
+
+GENDERS = ["FEMALE", "MALE"]
+ETHNICITIES = ["ASIAN AND PACIFIC ISLANDER", "BLACK NON HISPANIC",
+               "HISPANIC", "WHITE NON HISPANIC"]
+NAMES = ["Olivia", "Emma", "Sophia", "Isabella", "Mia", "Liam", "Noah",
+         "Ethan", "Jacob", "Jayden", "Chloe", "Aiden", "Zoe", "Leah"]
+
+
+def make_csv(path: str, rows: int, seed: int = 0) -> None:
+    """
+    Write a CSV shaped like Popular_Baby_Names.csv with `rows` data rows.
+
+    Args:
+        path (str): Where to write the file.
+        rows (int): The number of data rows.
+        seed (int): The random seed, for reproducible files (default is 0).
+    """
+    rng = random.Random(seed)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Year of Birth", "Gender", "Ethnicity",
+                         "Child's First Name", "Count", "Rank"])
+        for i in range(rows):
+            writer.writerow([rng.randint(2011, 2016), rng.choice(GENDERS),
+                             rng.choice(ETHNICITIES),
+                             "{}{}".format(rng.choice(NAMES), i % 1000),
+                             rng.randint(10, 300), rng.randint(1, 100)])
+
+
+def best_of(function: Callable, repeat: int = 3) -> float:
+    """
+    Time a call a few times and keep the fastest run.
+
+    Args:
+        function (Callable): The call to time.
+        repeat (int): The number of runs (default is 3).
+
+    Returns:
+        float: The fastest run, in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def bench_load(path: str, workers: List[int],
+               repeat: int = 3) -> List[Dict]:
+    """
+    Compare a serial `csv.reader` load with `read_csv_parallel`.
+
+    Args:
+        path (str): The CSV file.
+        workers (List[int]): The process counts to try.
+        repeat (int): Runs per measurement (default is 3).
+
+    Returns:
+        List[Dict]: One result per loader, with its time and speedup.
+    """
+    def serial():
+        with open(path, newline='') as f:
+            return [row for row in csv.reader(f)]
+
+    baseline = best_of(serial, repeat)
+    results = [{'loader': 'csv.reader', 'workers': 1,
+                'seconds': baseline, 'speedup': 1.0}]
+    for count in workers:
+        seconds = best_of(lambda: read_csv_parallel(path, count), repeat)
+        results.append({'loader': 'read_csv_parallel', 'workers': count,
+                        'seconds': seconds, 'speedup': baseline / seconds})
+    return results
+
+
+async def _loop_stall(done: asyncio.Event, interval: float = 0.001) -> float:
+    """Longest time the event loop went without running this coroutine
+    """
+    worst = 0.0
+    while not done.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def _run_clients(get_hyper: Callable, pages: List[List[int]],
+                       blocking: bool) -> float:
+    """Run one coroutine per client, each fetching its pages in turn, and
+    return the worst event loop stall seen meanwhile
+    """
+    async def client(numbers: List[int]) -> None:
+        for page in numbers:
+            if blocking:
+                get_hyper(page, 10)
+                await asyncio.sleep(0)
+            else:
+                await get_hyper(page, 10)
+
+    done = asyncio.Event()
+    stall = asyncio.ensure_future(_loop_stall(done))
+    await asyncio.sleep(0)
+    await asyncio.gather(*[client(numbers) for numbers in pages])
+    done.set()
+    return await stall
+
+
+def bench_async(rows: int, clients: int, requests: int,
+                seed: int = 0) -> List[Dict]:
+    """
+    Serve `clients` concurrent clients, each fetching `requests` random
+    pages from a cold server, with threads and a sync `Server`, with
+    coroutines calling the sync `Server`, and with an `AsyncServer`.
+
+    Args:
+        rows (int): The number of rows of the CSV in the working directory.
+        clients (int): The number of concurrent clients.
+        requests (int): Pages fetched by each client.
+        seed (int): The random seed of the pages (default is 0).
+
+    Returns:
+        List[Dict]: One result per mode, with its time, throughput and the
+            longest event loop stall (None when there is no loop).
+    """
+    rng = random.Random(seed)
+    last_page = max(1, rows // 10)
+    pages = [[rng.randint(1, last_page) for _ in range(requests)]
+             for _ in range(clients)]
+    total = clients * requests
+    results = []
+
+    server = Server()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(clients, 64)) as executor:
+        list(executor.map(
+            lambda numbers: [server.get_hyper(page, 10) for page in numbers],
+            pages))
+    results.append(('threads + Server', time.perf_counter() - started,
+                    None))
+
+    server = Server()
+    started = time.perf_counter()
+    stall = asyncio.run(_run_clients(server.get_hyper, pages, True))
+    results.append(('asyncio + Server', time.perf_counter() - started,
+                    stall))
+
+    server = AsyncServer()
+    started = time.perf_counter()
+    stall = asyncio.run(_run_clients(server.get_hyper, pages, False))
+    results.append(('asyncio + AsyncServer', time.perf_counter() - started,
+                    stall))
+
+    return [{'mode': mode, 'seconds': seconds,
+             'requests_per_second': total / seconds, 'max_stall': stall}
+            for mode, seconds, stall in results]
+
+
+def percentiles(timings: List[int]) -> Dict:
+    """
+    Summarize call timings.
+
+    Args:
+        timings (List[int]): The duration of each call, in nanoseconds.
+
+    Returns:
+        Dict: The median and 99th percentile, in microseconds.
+    """
+    timings = sorted(timings)
+    last = len(timings) - 1
+    return {'p50': timings[last // 2] / 1000,
+            'p99': timings[last * 99 // 100] / 1000}
+
+
+def latency(function: Callable, calls: List[Tuple]) -> Dict:
+    """
+    Time `function` once per argument tuple of `calls`.
+
+    Args:
+        function (Callable): The call to time.
+        calls (List[Tuple]): The arguments of each call.
+
+    Returns:
+        Dict: The p50 and p99 latency, in microseconds.
+    """
+    timings = []
+    clock = time.perf_counter_ns
+    for args in calls:
+        started = clock()
+        function(*args)
+        timings.append(clock() - started)
+    return percentiles(timings)
+
+
+def _peak_rss_mib() -> float:
+    """Peak resident memory of this process so far, in MiB
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB everywhere else.
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def bench_case(path: str, backend: str, deleted: float, samples: int,
+               page_size: int = 10, seed: int = 0) -> Dict:
+    """
+    Measure one dataset size, backend and deletion ratio.
+
+    Meant to run in a fresh process so that its memory figures are its own:
+    `load_rss_mib` is the peak once `Server` has loaded the file, and
+    `peak_rss_mib` the peak after the deletion-aware server has loaded it
+    too and `deleted` of its rows were deleted.
+
+    Args:
+        path (str): The CSV file.
+        backend (str): The `Server` backend.
+        deleted (float): The fraction of rows to delete before timing
+            `get_hyper_index`.
+        samples (int): Calls timed per operation and depth.
+        page_size (int): The page size of every call (default is 10).
+        seed (int): The random seed of pages and deletions (default is 0).
+
+    Returns:
+        Dict: Load times, memory and p50/p99 latencies in microseconds of
+            each operation at shallow and deep offsets.
+    """
+    rng = random.Random(seed)
+    base_rss = _peak_rss_mib()
+
+    server = Server(backend)
+    server.DATA_FILE = path
+    started = time.perf_counter()
+    rows = len(server.dataset())
+    cold_load = time.perf_counter() - started
+    load_rss = _peak_rss_mib()
+
+    last_page = max(1, -(-rows // page_size))
+    depths = {'shallow': (1, min(10, last_page)),
+              'deep': (max(1, last_page - 9), last_page)}
+    results = {'index_range': latency(index_range, [
+        (rng.randint(1, last_page), page_size) for _ in range(samples)])}
+    for depth, (low, high) in depths.items():
+        calls = [(rng.randint(low, high), page_size)
+                 for _ in range(samples)]
+        results['get_page/' + depth] = latency(server.get_page, calls)
+        results['get_hyper/' + depth] = latency(server.get_hyper, calls)
+
+    del_server = DelServer()
+    del_server.DATA_FILE = path
+    started = time.perf_counter()
+    indexed_dataset = del_server.indexed_dataset()
+    index_load = time.perf_counter() - started
+    for index in rng.sample(range(rows), int(rows * deleted)):
+        del indexed_dataset[index]
+    span = min(rows, 10 * page_size)
+    starts = {'shallow': (0, span - 1), 'deep': (rows - span, rows - 1)}
+    for depth, (low, high) in starts.items():
+        calls = [(rng.randint(low, high), page_size)
+                 for _ in range(samples)]
+        results['get_hyper_index/' + depth] = latency(
+            del_server.get_hyper_index, calls)
+
+    return {'rows': rows, 'backend': backend, 'deleted': deleted,
+            'cold_load_seconds': cold_load,
+            'index_load_seconds': index_load,
+            'load_rss_mib': load_rss - base_rss,
+            'peak_rss_mib': _peak_rss_mib() - base_rss,
+            'latency_us': results}
+
+
+def run_suite(directory: str, sizes: List[int], backends: List[str],
+              deletions: List[float], samples: int) -> Dict:
+    """
+    Run `bench_case` for every combination, each in a new worker process.
+
+    Args:
+        directory (str): Where to write the synthetic CSV files.
+        sizes (List[int]): The row counts to generate.
+        backends (List[str]): The `Server` backends to measure.
+        deletions (List[float]): The deletion ratios to measure.
+        samples (int): Calls timed per operation and depth.
+
+    Returns:
+        Dict: The environment the suite ran in and one result per case.
+    """
+    cases = []
+    context = multiprocessing.get_context('spawn')
+    for rows in sizes:
+        path = os.path.join(directory, "Popular_Baby_Names_{}.csv".format(
+            rows))
+        make_csv(path, rows)
+        for backend in backends:
+            for deleted in deletions:
+                # Cold means cold: no sidecar file left by an earlier case.
+                for suffix in (".cols", ".idx", ".snap"):
+                    if os.path.exists(path + suffix):
+                        os.remove(path + suffix)
+                with ProcessPoolExecutor(1, mp_context=context) as worker:
+                    cases.append(worker.submit(
+                        bench_case, path, backend, deleted,
+                        samples).result())
+                print("{rows:>10} {backend:>8} deleted={deleted:<4} "
+                      "load {cold_load_seconds:.3f}s "
+                      "rss {load_rss_mib:.1f} MiB".format(**cases[-1]))
+    return {'environment': {'python': platform.python_version(),
+                            'platform': platform.platform(),
+                            'cores': os.cpu_count(),
+                            'samples': samples},
+            'cases': cases}
+
+
+def _metrics(case: Dict) -> Dict[str, float]:
+    """The figures of a case where lower is better, by name
+    """
+    metrics = {'cold_load_seconds': case['cold_load_seconds'],
+               'index_load_seconds': case['index_load_seconds']}
+    for operation, timings in case['latency_us'].items():
+        for name, value in timings.items():
+            metrics['{} {}'.format(operation, name)] = value
+    return metrics
+
+
+def compare(results: Dict, baseline: Dict,
+            tolerance: float = 0.2) -> List[str]:
+    """
+    Find the figures of `results` worse than those of `baseline`.
+
+    Args:
+        results (Dict): The output of `run_suite`.
+        baseline (Dict): An earlier output of `run_suite`.
+        tolerance (float): The slowdown allowed, as a fraction (default is
+            0.2, i.e. 20%).
+
+    Returns:
+        List[str]: A description of each regression.
+    """
+    def key(case: Dict) -> Tuple:
+        return case['rows'], case['backend'], case['deleted']
+
+    previous = {key(case): _metrics(case) for case in baseline['cases']}
+    regressions = []
+    for case in results['cases']:
+        if key(case) not in previous:
+            continue
+        for name, value in _metrics(case).items():
+            before = previous[key(case)].get(name)
+            if before and value > before * (1 + tolerance):
+                regressions.append(
+                    "{} rows={} backend={} deleted={}: {:.3f} -> {:.3f}"
+                    .format(name, *key(case), before, value))
+    return regressions
+
+
+def main(argv: List[str] = None) -> None:
+    """Command line entry point
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    commands = parser.add_subparsers(dest='command', required=True)
+    load = commands.add_parser('load', help="time CSV loading per core count")
+    load.add_argument('--rows', type=int, default=1000000)
+    load.add_argument('--workers', type=int, nargs='+',
+                      default=[1, 2, 4, os.cpu_count() or 1])
+    load.add_argument('--repeat', type=int, default=3)
+    serve = commands.add_parser(
+        'async', help="compare sync and async servers under many clients")
+    serve.add_argument('--rows', type=int, default=1000000)
+    serve.add_argument('--clients', type=int, default=1000)
+    serve.add_argument('--requests', type=int, default=20)
+    suite = commands.add_parser(
+        'suite', help="measure load, latency and memory per case")
+    suite.add_argument('--rows', type=int, nargs='+',
+                       default=[10000, 100000, 1000000])
+    suite.add_argument('--backends', nargs='+', default=["csv"],
+                       choices=Server.BACKENDS)
+    suite.add_argument('--deleted', type=float, nargs='+', default=[0.0])
+    suite.add_argument('--samples', type=int, default=1000)
+    suite.add_argument('--output', help="write the results as JSON")
+    suite.add_argument('--compare', help="a previous --output to check")
+    suite.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    if args.command == 'suite':
+        with tempfile.TemporaryDirectory() as directory:
+            results = run_suite(directory, args.rows, args.backends,
+                                args.deleted, args.samples)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+        else:
+            print(json.dumps(results, indent=2))
+        if args.compare:
+            with open(args.compare) as f:
+                regressions = compare(results, json.load(f), args.tolerance)
+            for regression in regressions:
+                print("REGRESSION:", regression)
+            if regressions:
+                sys.exit(1)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "Popular_Baby_Names.csv")
+        make_csv(path, args.rows)
+        print("{} rows, {:.1f} MiB, {} cores".format(
+            args.rows, os.path.getsize(path) / 2 ** 20, os.cpu_count()))
+        if args.command == 'load':
+            for result in bench_load(path, args.workers, args.repeat):
+                print("{loader:>18} workers={workers:<3} {seconds:8.3f}s "
+                      "x{speedup:.2f}".format(**result))
+            return
+
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            results = bench_async(args.rows, args.clients, args.requests)
+        finally:
+            os.chdir(cwd)
+        for result in results:
+            stall = result['max_stall']
+            print("{:>22} {:8.3f}s {:10.0f} req/s  max loop stall {}".format(
+                result['mode'], result['seconds'],
+                result['requests_per_second'],
+                "-" if stall is None else "{:.3f}s".format(stall)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+This module contains the `ColumnarDataset` class, a read-only view of a CSV
+file that has been converted once into a compact, memory-mapped columnar file.
+
+Integer columns are stored as fixed-width arrays and text columns as an
+offsets array plus a UTF-8 string blob, so rows are only built for the slice
+that is actually requested and every process mapping the file shares the same
+pages through the OS page cache.
+"""
+
+import csv
+import json
+import mmap
+import struct
+from array import array
+from typing import Callable, List
+
+import sidecar_file
+from sidecar_file import RowRangeSequence, atomic_write, source_stat
+
+MAGIC = b"BNCOLS\x00\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sHHQqQ")
+ALIGNMENT = 8
+
+
+def _int_typecode(values: List[int]) -> str:
+    """
+    Pick the narrowest signed array typecode able to hold `values`.
+
+    Args:
+        values (List[int]): The integers to store.
+
+    Returns:
+        str: 'i' for 32-bit values, 'q' otherwise.
+    """
+    if not values or (min(values) >= -2 ** 31 and max(values) < 2 ** 31):
+        return 'i'
+    return 'q'
+
+
+def _as_ints(values: List[str]) -> List[int]:
+    """
+    Convert a column to integers if every value round-trips exactly.
+
+    Args:
+        values (List[str]): The raw column values.
+
+    Returns:
+        List[int]: The converted values, or None if the column is text.
+    """
+    if not values:
+        return None
+    try:
+        ints = [int(value) for value in values]
+    except ValueError:
+        return None
+    if any(str(i) != value for i, value in zip(ints, values)):
+        return None
+    return ints
+
+
+def build_columnar(csv_path: str, path: str) -> None:
+    """
+    Convert a CSV file into the columnar format read by `ColumnarDataset`.
+
+    The file is written next to its final location and atomically renamed
+    into place, so concurrent workers never map a half-written file.
+
+    Args:
+        csv_path (str): The CSV file to convert; its first row is the header.
+        path (str): Where to write the columnar file.
+    """
+    size, mtime_ns = source_stat(csv_path)
+    with open(csv_path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        columns = [[] for _ in header]
+        for row in reader:
+            if len(row) != len(header):
+                raise ValueError(
+                    "Row {} has {} fields, expected {}.".format(
+                        reader.line_num, len(row), len(header)))
+            for column, value in zip(columns, row):
+                column.append(value)
+    rows = len(columns[0]) if columns else 0
+
+    sections = []
+    meta_columns = []
+    for values in columns:
+        ints = _as_ints(values)
+        if ints is not None:
+            typecode = _int_typecode(ints)
+            sections.append(array(typecode, ints).tobytes())
+            meta_columns.append({'kind': 'int', 'typecode': typecode})
+        else:
+            encoded = [value.encode('utf-8') for value in values]
+            offsets = [0]
+            for chunk in encoded:
+                offsets.append(offsets[-1] + len(chunk))
+            typecode = 'I' if offsets[-1] < 2 ** 32 else 'Q'
+            sections.append(array(typecode, offsets).tobytes())
+            sections.append(b"".join(encoded))
+            meta_columns.append({'kind': 'str', 'typecode': typecode})
+
+    # Section offsets depend on the metadata length, which depends on the
+    # offsets; reserve a fixed-width field for each so one pass is enough.
+    placeholder = 2 ** 63 - 1
+    for column in meta_columns:
+        column['offset'] = placeholder
+        if column['kind'] == 'str':
+            column['blob'] = placeholder
+    meta = {'rows': rows, 'header': header, 'columns': meta_columns}
+    meta_len = len(json.dumps(meta).encode('utf-8'))
+
+    position = HEADER.size + meta_len
+    layout = []
+    for data in sections:
+        position += -position % ALIGNMENT
+        layout.append(position)
+        position += len(data)
+    positions = iter(layout)
+    for column in meta_columns:
+        column['offset'] = next(positions)
+        if column['kind'] == 'str':
+            column['blob'] = next(positions)
+    meta_bytes = json.dumps(meta).encode('utf-8')
+    meta_bytes += b" " * (meta_len - len(meta_bytes))
+
+    with atomic_write(path) as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, size, mtime_ns, meta_len))
+        f.write(meta_bytes)
+        for offset, data in zip(layout, sections):
+            f.write(b"\x00" * (offset - f.tell()))
+            f.write(data)
+
+
+def is_current(path: str, csv_path: str) -> bool:
+    """
+    Check whether a columnar file exists and matches the current CSV.
+
+    Args:
+        path (str): The columnar file.
+        csv_path (str): The CSV file it was built from.
+
+    Returns:
+        bool: True if the columnar file can be used as is.
+    """
+    return sidecar_file.is_current(path, csv_path, HEADER, MAGIC, VERSION)
+
+
+class ColumnarDataset(RowRangeSequence):
+    """Read-only sequence of rows backed by a memory-mapped columnar file.
+
+    Rows are returned as lists of strings, exactly as `csv.reader` would
+    produce them, but only the requested rows are ever materialized. With a
+    `row_factory`, each row is instead passed to it as a tuple of fields in
+    which integer columns are already `int`.
+    """
+
+    def __init__(self, path: str, row_factory: Callable = None):
+        self.__row_factory = row_factory
+        with open(path, 'rb') as f:
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.__mmap)
+        magic, version, _, _, _, meta_len = HEADER.unpack_from(view)
+        assert magic == MAGIC and version == VERSION, (
+            "Not a columnar dataset file: {}".format(path))
+        meta = json.loads(bytes(view[HEADER.size:HEADER.size + meta_len]))
+
+        self.__rows = meta['rows']
+        self.header = meta['header']
+        self.__views = [view]
+        self.__columns = []
+        for column in meta['columns']:
+            width = array(column['typecode']).itemsize
+            start = column['offset']
+            values = view[start:start + width * (self.__rows + (
+                column['kind'] == 'str'))].cast(column['typecode'])
+            self.__views.append(values)
+            blob = None
+            if column['kind'] == 'str':
+                blob = view[column['blob']:column['blob'] + values[-1]]
+                self.__views.append(blob)
+            self.__columns.append((values, blob))
+
+    @classmethod
+    def from_csv(cls, csv_path: str, path: str = None,
+                 row_factory: Callable = None) -> "ColumnarDataset":
+        """
+        Open the columnar copy of a CSV file, building it first if it is
+        missing or older than the CSV.
+
+        Args:
+            csv_path (str): The CSV file.
+            path (str): The columnar file (default is `csv_path` + ".cols").
+            row_factory (Callable): Builds a row from its tuple of typed
+                fields (default is None, lists of strings).
+
+        Returns:
+            ColumnarDataset: The memory-mapped dataset.
+        """
+        if path is None:
+            path = csv_path + ".cols"
+        if not is_current(path, csv_path):
+            build_columnar(csv_path, path)
+        return cls(path, row_factory)
+
+    def __len__(self) -> int:
+        return self.__rows
+
+    def _read_range(self, start: int, stop: int) -> List[List]:
+        """Build the rows in [start, stop) column by column
+        """
+        if start >= stop:
+            return []
+        fields = []
+        for values, blob in self.__columns:
+            if blob is not None:
+                offsets = values[start:stop + 1].tolist()
+                fields.append([str(blob[a:b], 'utf-8')
+                               for a, b in zip(offsets, offsets[1:])])
+            elif self.__row_factory is not None:
+                fields.append(values[start:stop].tolist())
+            else:
+                fields.append([str(v) for v in values[start:stop]])
+        if self.__row_factory is not None:
+            return [self.__row_factory(row) for row in zip(*fields)]
+        return [list(row) for row in zip(*fields)]
+
+    def close(self) -> None:
+        """Release the memory map
+        """
+        for view in reversed(self.__views):
+            view.release()
+        self.__views = []
+        self.__mmap.close()
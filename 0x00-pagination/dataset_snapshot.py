@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+This module contains the `load_snapshot` and `save_snapshot` functions, which
+keep a binary snapshot of a parsed CSV file and of the indexes built on it.
+
+A snapshot is keyed by the size, modification time and BLAKE2b hash of the
+CSV. When size and mtime match it is used straight away; when only the mtime
+changed (e.g. the same file copied again) the hash decides. The payload is a
+`marshal` dump read directly out of a memory map with the cyclic garbage
+collector paused, which is several times faster than parsing the CSV again.
+"""
+
+import gc
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, List, Tuple
+
+from sidecar_file import atomic_write, source_stat
+
+MAGIC = b"BNSNAPSH"
+VERSION = 1
+HEADER = struct.Struct("<8sHHQq32sIQ")
+PYTHON = sys.hexversion >> 16
+BLOCK_SIZE = 1 << 20
+
+
+def file_digest(path: str) -> bytes:
+    """
+    Hash a file with BLAKE2b.
+
+    Args:
+        path (str): The file.
+
+    Returns:
+        bytes: The 32-byte digest.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def load_snapshot(csv_path: str, path: str = None,
+                  schema: Tuple = None) -> Dict:
+    """
+    Load the snapshot of a CSV file if it matches the file's current content.
+
+    Args:
+        csv_path (str): The CSV file.
+        path (str): The snapshot (default is `csv_path` + ".snap").
+        schema (Tuple): The description of the row types the snapshot must
+            have been saved with (default is None, raw rows).
+
+    Returns:
+        Dict: The saved "rows" and "indexes", or None if there is no usable
+            snapshot.
+    """
+    if path is None:
+        path = csv_path + ".snap"
+    try:
+        f = open(path, 'rb')
+    except OSError:
+        return None
+    with f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            return None
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with data:
+        (magic, version, _, size, mtime_ns, digest, python,
+         length) = HEADER.unpack_from(data)
+        if (magic, version, python) != (MAGIC, VERSION, PYTHON):
+            return None
+        if len(data) != HEADER.size + length:
+            return None
+        current = source_stat(csv_path)
+        if current != (size, mtime_ns) and (
+                current[0] != size or file_digest(csv_path) != digest):
+            return None
+        # Millions of new row lists would otherwise trigger collections
+        # that only rediscover them as live.
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            with memoryview(data) as view:
+                saved = marshal.loads(view[HEADER.size:])
+        except (EOFError, ValueError, TypeError):
+            return None
+        finally:
+            if collecting:
+                gc.enable()
+    if not isinstance(saved, dict) or saved.get('schema') != schema:
+        return None
+    return saved
+
+
+def save_snapshot(csv_path: str, signature: Tuple[int, int], rows: List,
+                  indexes: Dict = None, path: str = None,
+                  schema: Tuple = None) -> bool:
+    """
+    Write the snapshot of a CSV file, atomically replacing any older one.
+
+    Args:
+        csv_path (str): The CSV file the rows were parsed from.
+        signature (Tuple[int, int]): The CSV's (size, mtime_ns) taken before
+            it was parsed; nothing is written if the file changed since.
+        rows (List): The parsed rows.
+        indexes (Dict): Indexes built on the rows, made of types `marshal`
+            supports (default is None, no indexes).
+        path (str): The snapshot (default is `csv_path` + ".snap").
+        schema (Tuple): A description of the row types, checked by
+            `load_snapshot` (default is None, raw rows).
+
+    Returns:
+        bool: True if the snapshot was written.
+    """
+    if path is None:
+        path = csv_path + ".snap"
+    digest = file_digest(csv_path)
+    if source_stat(csv_path) != tuple(signature):
+        return False
+    payload = marshal.dumps({'rows': rows, 'indexes': indexes or {},
+                             'schema': schema})
+
+    with atomic_write(path) as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, signature[0], signature[1],
+                            digest, PYTHON, len(payload)))
+        f.write(payload)
+    return True
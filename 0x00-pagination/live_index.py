@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+This module contains the `LiveIndex` class, which tracks which rows of a
+dataset are still live after deletions, and the `IndexedDataset` mapping of
+row index to row built on top of it.
+
+A bitmap answers "is row i live?" in O(1) and a Fenwick (binary indexed) tree
+of live counts answers "how many live rows come before i?" and "where is the
+k-th live row?" in O(log n), so runs of deleted rows are skipped in a single
+jump instead of being scanned one slot at a time.
+
+`IndexedDataset` keeps the rows in the dataset's own list and the deletions in
+the `LiveIndex` bitmap, so indexing a dataset costs about one bit plus one
+tree counter per row instead of a dict entry and a boxed key.
+"""
+
+from array import array
+from collections.abc import Mapping
+from typing import Iterator, List, Sequence
+
+
+class LiveIndex:
+    """Live-row bitmap plus a Fenwick tree over the live counts.
+    """
+
+    def __init__(self, size: int):
+        """
+        Start with every one of `size` rows live.
+
+        Args:
+            size (int): The number of row slots.
+        """
+        self.size = size
+        self.__live = size
+        self.__bits = bytearray(b"\xff") * ((size + 7) // 8)
+        # A Fenwick tree over all ones: node i covers (i & -i) rows.
+        self.__tree = array('i' if size < 2 ** 31 else 'q',
+                            (i & -i for i in range(size + 1)))
+        self.__top = 1 << size.bit_length() >> 1 if size else 0
+
+    def __len__(self) -> int:
+        return self.__live
+
+    def __contains__(self, index: int) -> bool:
+        return (0 <= index < self.size and
+                self.__bits[index >> 3] >> (index & 7) & 1 == 1)
+
+    def delete(self, index: int) -> bool:
+        """
+        Mark a row as deleted in O(log n).
+
+        Args:
+            index (int): The row to delete.
+
+        Returns:
+            bool: True if the row was live.
+        """
+        if index not in self:
+            return False
+        self.__bits[index >> 3] &= ~(1 << (index & 7)) & 0xff
+        self.__live -= 1
+        node = index + 1
+        while node <= self.size:
+            self.__tree[node] -= 1
+            node += node & -node
+        return True
+
+    def rank(self, index: int) -> int:
+        """
+        Count the live rows before `index`.
+
+        Args:
+            index (int): A row slot, 0 <= index <= size.
+
+        Returns:
+            int: The number of live rows in [0, index).
+        """
+        count = 0
+        while index > 0:
+            count += self.__tree[index]
+            index -= index & -index
+        return count
+
+    def select(self, k: int) -> int:
+        """
+        Find the k-th live row (0-based) in O(log n).
+
+        Args:
+            k (int): The rank of the row, 0 <= k < len(self).
+
+        Returns:
+            int: The slot of that row.
+        """
+        position = 0
+        remaining = k + 1
+        step = self.__top
+        while step:
+            node = position + step
+            if node <= self.size and self.__tree[node] < remaining:
+                position = node
+                remaining -= self.__tree[node]
+            step >>= 1
+        return position
+
+    def live_from(self, index: int, count: int) -> List[int]:
+        """
+        List up to `count` live rows at or after `index`.
+
+        Consecutive live rows are read straight off the bitmap and each run
+        of deleted rows costs one O(log n) jump, so a page with no holes
+        costs O(count + log n).
+
+        Args:
+            index (int): The first slot to consider.
+            count (int): The maximum number of rows to return.
+
+        Returns:
+            List[int]: The slots of the live rows, in order.
+        """
+        rows = []
+        rank = self.rank(min(index, self.size))
+        bits = self.__bits
+        while len(rows) < count and rank < self.__live:
+            if index < self.size and bits[index >> 3] >> (index & 7) & 1:
+                rows.append(index)
+                rank += 1
+                index += 1
+            else:
+                index = self.select(rank)
+        return rows
+
+
+class IndexedDataset(Mapping):
+    """Mapping of row index to row that survives deletions.
+
+    It exposes the `in` / `[]` / `len` / `del` surface of the
+    `{index: row}` dict it replaces: deleted indexes are absent and `len` is
+    the number of live rows.
+    """
+
+    def __init__(self, rows: Sequence[List]):
+        """
+        Index every row of `rows` by its position, starting at 0.
+
+        Args:
+            rows (Sequence[List]): The rows; the list is shared, not copied.
+        """
+        self.rows = rows
+        self.size = len(rows)
+        self.live_index = LiveIndex(self.size)
+
+    def __len__(self) -> int:
+        return len(self.live_index)
+
+    def __contains__(self, index) -> bool:
+        return isinstance(index, int) and index in self.live_index
+
+    def __getitem__(self, index: int) -> List:
+        if index not in self:
+            raise KeyError(index)
+        return self.rows[index]
+
+    def __delitem__(self, index: int) -> None:
+        if not (isinstance(index, int) and self.live_index.delete(index)):
+            raise KeyError(index)
+
+    def __iter__(self) -> Iterator[int]:
+        live_index = self.live_index
+        return (i for i in range(self.size) if i in live_index)
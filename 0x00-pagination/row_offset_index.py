@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+This module contains the `RowOffsetDataset` class, which pages through a CSV
+file by seeking straight to the requested rows using a sidecar index of the
+byte offset at which every row starts.
+
+The index is built with a single byte scan of the file, stored next to it and
+reused across restarts until the CSV changes, so reading any page only parses
+the lines of that page.
+"""
+
+import csv
+import io
+import mmap
+import os
+import struct
+from array import array
+from typing import Callable, List
+
+import sidecar_file
+from sidecar_file import RowRangeSequence, atomic_write, source_stat
+
+MAGIC = b"BNROWIDX"
+VERSION = 1
+HEADER = struct.Struct("<8sHHQqQ")
+
+
+def build_row_index(csv_path: str, path: str) -> None:
+    """
+    Write the byte offset of every data row of a CSV file to `path`.
+
+    Quoted fields may span lines: a record only ends on a line break that
+    follows an even number of quote characters.
+
+    Args:
+        csv_path (str): The CSV file to index; its first row is the header.
+        path (str): Where to write the index.
+    """
+    size, mtime_ns = source_stat(csv_path)
+    offsets = array('Q')
+    with open(csv_path, 'rb') as f:
+        position = record_start = quotes = 0
+        for line in f:
+            quotes += line.count(b'"')
+            position += len(line)
+            if quotes % 2 == 0:
+                offsets.append(record_start)
+                record_start = position
+                quotes = 0
+        if record_start != position:
+            offsets.append(record_start)
+    offsets.append(position)
+    # Drop the header row; the trailing entry is the end of the last row.
+    offsets = offsets[1:] if len(offsets) > 1 else offsets
+
+    with atomic_write(path) as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, size, mtime_ns,
+                            len(offsets) - 1))
+        f.write(offsets.tobytes())
+
+
+def is_current(path: str, csv_path: str) -> bool:
+    """
+    Check whether a row index exists and matches the current CSV.
+
+    Args:
+        path (str): The index file.
+        csv_path (str): The CSV file it was built from.
+
+    Returns:
+        bool: True if the index can be used as is.
+    """
+    return sidecar_file.is_current(path, csv_path, HEADER, MAGIC, VERSION)
+
+
+class RowOffsetDataset(RowRangeSequence):
+    """Read-only sequence of CSV rows read on demand through a row index.
+
+    Slicing seeks to the first requested row and parses only the bytes up to
+    the end of the last one; nothing else of the file is read or kept. With a
+    `row_factory`, each parsed row is passed through it.
+
+    The CSV is opened once, when the dataset is built, and always read
+    through that handle: once the file is replaced, the dataset keeps
+    reading the version its offsets were taken from.
+    """
+
+    def __init__(self, csv_path: str, path: str,
+                 row_factory: Callable = None):
+        self.csv_path = csv_path
+        self.__row_factory = row_factory
+        with open(path, 'rb') as f:
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, size, mtime_ns, rows = HEADER.unpack_from(
+            self.__mmap)
+        assert magic == MAGIC and version == VERSION, (
+            "Not a row index file: {}".format(path))
+        self.__rows = rows
+        self.__offsets = memoryview(self.__mmap)[HEADER.size:].cast('Q')
+        self.__file = open(csv_path, 'rb')
+        st = os.fstat(self.__file.fileno())
+        if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+            self.close()
+            raise ValueError(
+                "Row index {} does not match {}.".format(path, csv_path))
+
+    @classmethod
+    def from_csv(cls, csv_path: str, path: str = None,
+                 row_factory: Callable = None) -> "RowOffsetDataset":
+        """
+        Open a CSV file through its row index, building the index first if it
+        is missing or older than the CSV.
+
+        Args:
+            csv_path (str): The CSV file.
+            path (str): The index file (default is `csv_path` + ".idx").
+            row_factory (Callable): Builds a row from its list of fields
+                (default is None, the list itself).
+
+        Returns:
+            RowOffsetDataset: The indexed dataset.
+        """
+        if path is None:
+            path = csv_path + ".idx"
+        if not is_current(path, csv_path):
+            build_row_index(csv_path, path)
+        try:
+            return cls(csv_path, path, row_factory)
+        except ValueError:
+            # The CSV was replaced between the check and the open.
+            build_row_index(csv_path, path)
+            return cls(csv_path, path, row_factory)
+
+    def __len__(self) -> int:
+        return self.__rows
+
+    def _read_range(self, start: int, stop: int) -> List[List]:
+        """Seek to row `start` and parse the rows in [start, stop)
+        """
+        if start >= stop:
+            return []
+        begin, end = self.__offsets[start], self.__offsets[stop]
+        data = os.pread(self.__file.fileno(), end - begin, begin)
+        rows = csv.reader(io.StringIO(data.decode('utf-8'), newline=''))
+        if self.__row_factory is not None:
+            return [self.__row_factory(row) for row in rows]
+        return list(rows)
+
+    def close(self) -> None:
+        """Release the memory-mapped index and the CSV file
+        """
+        self.__file.close()
+        self.__offsets.release()
+        self.__mmap.close()
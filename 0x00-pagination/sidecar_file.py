@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+This module contains what the files kept next to a CSV file (the columnar
+copy, the row offset index and the parsed snapshot) have in common: how they
+are tied to a version of the CSV, how they are written, and how the datasets
+reading them are indexed.
+
+Every such file starts with a header whose first fields are a magic string,
+a format version, padding, and the size and modification time (ns) of the
+CSV it was built from.
+"""
+
+import contextlib
+import os
+import struct
+from collections.abc import Sequence
+from typing import Iterator, List, Tuple, BinaryIO
+
+
+def source_stat(path: str) -> Tuple[int, int]:
+    """Size and modification time (ns) identifying a version of a file
+    """
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+def is_current(path: str, csv_path: str, header: struct.Struct,
+               magic: bytes, version: int) -> bool:
+    """
+    Check whether a sidecar file exists and matches the current CSV.
+
+    Args:
+        path (str): The sidecar file.
+        csv_path (str): The CSV file it was built from.
+        header (struct.Struct): The header layout, starting with the magic,
+            version, padding, size and mtime fields.
+        magic (bytes): The magic string of the format.
+        version (int): The version of the format.
+
+    Returns:
+        bool: True if the sidecar file can be used as is.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(header.size)
+    except OSError:
+        return False
+    if len(data) != header.size:
+        return False
+    fields = header.unpack(data)
+    return (fields[:2] == (magic, version) and
+            fields[3:5] == source_stat(csv_path))
+
+
+@contextlib.contextmanager
+def atomic_write(path: str) -> Iterator[BinaryIO]:
+    """
+    Write a file next to `path` and rename it into place once complete, so
+    readers never see a half-written file.
+
+    Args:
+        path (str): The file to write.
+
+    Yields:
+        BinaryIO: The temporary file to write to.
+    """
+    tmp_path = "{}.tmp.{}".format(path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+class RowRangeSequence(Sequence):
+    """Read-only sequence of rows read a range at a time.
+
+    Subclasses implement `__len__` and `_read_range`; indexing and slicing
+    are turned into calls to `_read_range`.
+    """
+
+    def _read_range(self, start: int, stop: int) -> List:
+        """The rows in [start, stop), with 0 <= start <= stop <= len(self)
+        """
+        raise NotImplementedError
+
+    def __getitem__(self, index):
+        rows = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(rows)
+            if step != 1:
+                return [self._read_range(i, i + 1)[0]
+                        for i in range(start, stop, step)]
+            return self._read_range(start, max(start, stop))
+        if index < 0:
+            index += rows
+        if not 0 <= index < rows:
+            raise IndexError("dataset index out of range")
+        return self._read_range(index, index + 1)[0]
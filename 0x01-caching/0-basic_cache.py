@@ -2,23 +2,35 @@
 """ BasicCache module
 """
 
-from base_caching import BaseCaching
+from bounded_caching import BoundedCaching
 
 
-class BasicCache(BaseCaching):
+class BasicCache(BoundedCaching):
     """ BasicCache defines:
-      - a basic caching system that inherits from BaseCaching
+      - a basic caching system without limit, whose items can still expire
     """
 
-    def put(self, key, item):
+    def __init__(self):
+        """ Initialize
+        """
+        super().__init__()
+        self.max_items = None
+
+    def put(self, key, item, ttl=None):
         """ Add an item in the cache
         If key or item is None, this method should not do anything.
+        If ttl is given, the item expires ttl seconds from now.
         """
         if key is not None and item is not None:
+            self.sweep(self.SWEEP_STEP)
             self.cache_data[key] = item
+            self.set_ttl(key, ttl)
 
     def get(self, key):
         """ Get an item by key
-        If key is None or if the key doesn’t exist, return None.
+        If key is None, if the key doesn’t exist or if it expired, return
+        None.
         """
-        return self.cache_data.get(key)
+        if key is None or key not in self.cache_data or self.expired(key):
+            return None
+        return self.cache_data[key]
@@ -2,38 +2,46 @@
 """ FIFOCache module
 """
 
-from base_caching import BaseCaching
+from bounded_caching import BoundedCaching
+from collections import OrderedDict
 
 
-class FIFOCache(BaseCaching):
+class FIFOCache(BoundedCaching):
     """ FIFOCache defines:
       - a caching system that follows FIFO algorithm
     """
 
-    def __init__(self):
+    def __init__(self, max_items=None, max_bytes=None, sizer=None):
         """ Initialize
         """
-        super().__init__()
-        self.order = []
+        super().__init__(max_items, max_bytes, sizer)
+        self.cache_data = OrderedDict()
 
-    def put(self, key, item):
+    def put(self, key, item, ttl=None):
         """ Add an item in the cache
         If key or item is None, this method should not do anything.
-        If the number of items in self.cache_data is higher than BaseCaching.
-        discard the first item put in cache (FIFO algorithm) and print DISCARD.
+        While the cache is over capacity, discard the first item put in cache
+        (FIFO algorithm).
+        If ttl is given, the item expires ttl seconds from now.
         """
         if key is not None and item is not None:
-            if key not in self.cache_data:
-                self.order.append(key)
+            self.sweep(self.SWEEP_STEP)
+            if not self.charge(key, item):
+                self.pop(key)
+                return
             self.cache_data[key] = item
-
-            if len(self.cache_data) > BaseCaching.MAX_ITEMS:
-                discard_key = self.order.pop(0)
-                del self.cache_data[discard_key]
-                print("DISCARD: {}".format(discard_key))
+            self.set_ttl(key, ttl)
+            while self.over_budget():
+                for discard_key in self.cache_data:
+                    if discard_key != key:
+                        break
+                self.discard(discard_key)
 
     def get(self, key):
         """ Get an item by key
-        If key is None or if the key doesn’t exist, return None.
+        If key is None, if the key doesn’t exist or if it expired, return
+        None.
         """
+        if self.expired(key):
+            return None
         return self.cache_data.get(key)
@@ -2,58 +2,113 @@
 """ LFUCache module """
 
 from collections import defaultdict, OrderedDict
-from base_caching import BaseCaching
+from bounded_caching import BoundedCaching
 
 
-class LFUCache(BaseCaching):
+class LFUCache(BoundedCaching):
     """LFUCache class defines cache with Least Frequently Used eviction policy
     and Least Recently Used tie-breaking.
+
+    Frequencies age: once the cache has seen AGING_FACTOR accesses per item,
+    every frequency is halved, so keys that were popular once end up being
+    evicted when they stop being used. Buckets of frequencies no key has
+    are dropped.
     """
-    def __init__(self):
+    AGING_FACTOR = 10
+
+    def __init__(self, max_items=None, max_bytes=None, sizer=None):
         """ Initialize LFUCache """
-        super().__init__()
+        super().__init__(max_items, max_bytes, sizer)
         self.freq = defaultdict(int)  # Frequency of access
         self.items = defaultdict(OrderedDict)  # Items at each frequency
         self.min_freq = 0  # Minimum frequency in the cache
+        self.accesses = 0  # Accesses since frequencies were last halved
 
-    def put(self, key, item):
-        """ Add an item to the cache """
+    def put(self, key, item, ttl=None):
+        """ Add an item to the cache, expiring ttl seconds from now if
+        given """
         if key is None or item is None:
             return
+        self.sweep(self.SWEEP_STEP)
+        if not self.charge(key, item):
+            self.pop(key)
+            return
 
         if key in self.cache_data:
             self.cache_data[key] = item
-            self.freq[key] += 1
-            old_freq = self.freq[key] - 1
-            del self.items[old_freq][key]
-            if not self.items[old_freq] and old_freq == self.min_freq:
-                self.min_freq += 1
+            self.__bump(key)
             self.items[self.freq[key]][key] = item
         else:
-            if len(self.cache_data) >= BaseCaching.MAX_ITEMS:
-                key_to_remove, _ = (self.items
-                                    [self.min_freq].popitem(last=False))
-                del self.cache_data[key_to_remove]
-                del self.freq[key_to_remove]
-                print(f"DISCARD: {key_to_remove}")
-
             self.cache_data[key] = item
             self.freq[key] = 1
             self.items[1][key] = item
             self.min_freq = 1
+            self.__age()
+        self.set_ttl(key, ttl)
 
-    def get(self, key):
-        """ Retrieve an item from the cache """
+        while self.over_budget():
+            self.discard(self.__victim(key))
+
+    def __victim(self, key):
+        """ The least frequently used key other than key, least recently
+        used first among equals """
+        for candidate in self.items.get(self.min_freq, ()):
+            if candidate != key:
+                return candidate
+        # Only `key` has the minimum frequency: look at the next ones.
+        for freq in sorted(self.items):
+            for candidate in self.items[freq]:
+                if candidate != key:
+                    return candidate
+
+    def pop(self, key):
+        """ Remove an item from the cache and return it """
         if key is None or key not in self.cache_data:
             return None
+        freq = self.freq.pop(key)
+        del self.items[freq][key]
+        if not self.items[freq]:
+            del self.items[freq]
+            if freq == self.min_freq:
+                self.min_freq = min(self.items, default=0)
+        self.release(key)
+        return self.cache_data.pop(key)
+
+    def get(self, key):
+        """ Retrieve an item from the cache, None if missing or expired """
+        if key is None or key not in self.cache_data or self.expired(key):
+            return None
+
+        self.__bump(key)
+        return self.cache_data[key]
 
+    def __bump(self, key):
+        """ Count an access to a cached key """
         freq = self.freq[key]
         self.freq[key] += 1
-        new_freq = self.freq[key]
+        item = self.items[freq].pop(key)
+        if not self.items[freq]:
+            del self.items[freq]
+            if freq == self.min_freq:
+                self.min_freq += 1
+        self.items[freq + 1][key] = item
+        self.__age()
 
-        del self.items[freq][key]
-        if not self.items[freq] and freq == self.min_freq:
-            self.min_freq += 1
+    def __age(self):
+        """ Halve every frequency once enough accesses were counted
 
-        self.items[new_freq][key] = self.cache_data[key]
-        return self.cache_data[key]
+        This costs O(n) every AGING_FACTOR * n accesses, so O(1) amortized.
+        Within a new bucket, keys of the lower old frequency come first.
+        """
+        self.accesses += 1
+        if self.accesses < self.AGING_FACTOR * max(len(self.cache_data), 1):
+            return
+        self.accesses = 0
+        items = defaultdict(OrderedDict)
+        for freq in sorted(self.items):
+            aged = max(1, freq // 2)
+            for key, item in self.items[freq].items():
+                self.freq[key] = aged
+                items[aged][key] = item
+        self.items = items
+        self.min_freq = min(items, default=0)
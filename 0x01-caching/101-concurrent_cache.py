@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+""" Concurrent caches module
+"""
+
+import threading
+
+from base_caching import BaseCaching
+
+LRUCache = __import__('3-lru_cache').LRUCache
+LFUCache = __import__('100-lfu_cache').LFUCache
+
+
+class ShardedCache(BaseCaching):
+    """ ShardedCache defines:
+      - a thread-safe caching system that hashes keys across independently
+        locked shards, each one a cache of the POLICY class, so threads
+        working on different shards never wait for each other
+
+    The capacity is split evenly between the shards and each shard evicts
+    on its own, so eviction follows the policy within a shard rather than
+    across the whole cache. Likewise an item larger than the byte budget of
+    its shard, max_bytes / len(shards), is never cached; there are never
+    so many shards that this budget falls under MIN_SHARD_BYTES, unless
+    max_bytes itself is smaller.
+    """
+    POLICY = None
+    MIN_SHARD_BYTES = 4096
+
+    def __init__(self, shards=16, max_items=None, max_bytes=None,
+                 sizer=None):
+        """ Initialize
+        There are never more shards than max_items, so that every shard can
+        hold at least one item, nor than max_bytes / MIN_SHARD_BYTES.
+        """
+        # cache_data is a merged view of the shards, not a dict of its own,
+        # so BaseCaching.__init__ is not called.
+        assert isinstance(shards, int) and shards > 0, (
+            "shards must be an integer greater than 0.")
+        if max_items is None and max_bytes is None:
+            max_items = self.MAX_ITEMS
+        if max_items is not None:
+            shards = min(shards, max_items)
+        if max_bytes is not None:
+            shards = max(1, min(shards, max_bytes // self.MIN_SHARD_BYTES))
+        self.shards = []
+        for i in range(shards):
+            shard_items = shard_bytes = None
+            if max_items is not None:
+                shard_items = max_items // shards + (i < max_items % shards)
+            if max_bytes is not None:
+                shard_bytes = max_bytes // shards + (i < max_bytes % shards)
+            self.shards.append((threading.Lock(), self.POLICY(
+                max_items=shard_items, max_bytes=shard_bytes, sizer=sizer)))
+
+    @property
+    def cache_data(self):
+        """ A copy of the items of every shard
+        """
+        data = {}
+        for lock, shard in self.shards:
+            with lock:
+                data.update(shard.cache_data)
+        return data
+
+    @property
+    def on_evict(self):
+        """ The eviction listener of the shards
+        It is called with the lock of the evicting shard held, so it must
+        be thread-safe and must not use this cache.
+        """
+        return self.shards[0][1].on_evict
+
+    @on_evict.setter
+    def on_evict(self, listener):
+        """ Set the eviction listener of every shard
+        """
+        for lock, shard in self.shards:
+            with lock:
+                shard.on_evict = listener
+
+    def __shard(self, key):
+        """ The (lock, cache) pair holding key
+        """
+        return self.shards[hash(key) % len(self.shards)]
+
+    def put(self, key, item, ttl=None):
+        """ Add an item in the cache
+        If key or item is None, this method should not do anything.
+        If ttl is given, the item expires ttl seconds from now.
+        """
+        if key is None or item is None:
+            return
+        lock, shard = self.__shard(key)
+        with lock:
+            shard.put(key, item, ttl)
+
+    def get(self, key):
+        """ Get an item by key
+        If key is None, if the key doesn’t exist or if it expired, return
+        None.
+        """
+        if key is None:
+            return None
+        lock, shard = self.__shard(key)
+        with lock:
+            return shard.get(key)
+
+    def pop(self, key):
+        """ Remove an item by key and return it
+        If key is None or if the key doesn’t exist, return None.
+        """
+        if key is None:
+            return None
+        lock, shard = self.__shard(key)
+        with lock:
+            return shard.pop(key)
+
+    def sweep(self, limit=None):
+        """ Remove expired items from every shard, one shard at a time
+        Look at no more than limit deadlines per shard and return the number
+        of items removed.
+        """
+        removed = 0
+        for lock, shard in self.shards:
+            with lock:
+                removed += shard.sweep(limit)
+        return removed
+
+    def __len__(self):
+        """ The number of items in the cache
+        """
+        return sum(len(shard.cache_data) for _, shard in self.shards)
+
+
+class ConcurrentLRUCache(ShardedCache):
+    """ ConcurrentLRUCache defines:
+      - a thread-safe caching system that follows LRU algorithm per shard
+    """
+    POLICY = LRUCache
+
+
+class ConcurrentLFUCache(ShardedCache):
+    """ ConcurrentLFUCache defines:
+      - a thread-safe caching system that follows LFU algorithm per shard
+    """
+    POLICY = LFUCache
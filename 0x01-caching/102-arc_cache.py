@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+""" ARCCache module
+"""
+
+from collections import OrderedDict
+
+from bounded_caching import BoundedCaching
+
+
+class ARCCache(BoundedCaching):
+    """ ARCCache defines:
+      - a caching system that follows the Adaptive Replacement Cache
+        algorithm (Megiddo and Modha)
+
+    Keys seen once live in t1 and keys seen again in t2, both in LRU order.
+    Recently evicted keys are remembered, without their items, in the ghost
+    lists b1 and b2; a put of a ghost key shifts the target size p of t1
+    towards the list that would have kept it. A scan of keys used only once
+    therefore churns t1 without flushing the frequently used keys of t2.
+    """
+
+    def __init__(self, max_items=None, max_bytes=None, sizer=None):
+        """ Initialize
+        """
+        assert max_bytes is None, "ARCCache is sized in items only."
+        super().__init__(max_items, max_bytes, sizer)
+        self.t1 = OrderedDict()
+        self.t2 = OrderedDict()
+        self.b1 = OrderedDict()
+        self.b2 = OrderedDict()
+        self.p = 0
+
+    def put(self, key, item, ttl=None):
+        """ Add an item in the cache
+        If key or item is None, this method should not do anything.
+        When the cache is full, discard the least recently used item of t1
+        or t2, as chosen by the ARC algorithm.
+        If ttl is given, the item expires ttl seconds from now.
+        """
+        if key is None or item is None:
+            return
+        self.sweep(self.SWEEP_STEP)
+        c = self.max_items
+
+        if key in self.t1 or key in self.t2:
+            self.cache_data[key] = item
+            self.set_ttl(key, ttl)
+            self.__hit(key)
+            return
+
+        if key in self.b1:
+            self.p = min(c, self.p + max(len(self.b2) // len(self.b1), 1))
+            self.__replace(key)
+            del self.b1[key]
+            self.t2[key] = None
+        elif key in self.b2:
+            self.p = max(0, self.p - max(len(self.b1) // len(self.b2), 1))
+            self.__replace(key)
+            del self.b2[key]
+            self.t2[key] = None
+        else:
+            if len(self.t1) + len(self.b1) >= c:
+                if len(self.t1) < c:
+                    self.b1.popitem(last=False)
+                    self.__replace(key)
+                else:
+                    self.discard(next(iter(self.t1)))
+            elif (len(self.t1) + len(self.t2) + len(self.b1) +
+                  len(self.b2)) >= c:
+                if len(self.t1) + len(self.t2) + len(self.b1) + len(
+                        self.b2) >= 2 * c:
+                    self.b2.popitem(last=False)
+                self.__replace(key)
+            self.t1[key] = None
+        self.cache_data[key] = item
+        self.set_ttl(key, ttl)
+
+    def __hit(self, key):
+        """ Move key to the most recently used end of t2
+        """
+        if key in self.t1:
+            del self.t1[key]
+            self.t2[key] = None
+        else:
+            self.t2.move_to_end(key)
+
+    def __replace(self, key):
+        """ Make room for key if the cache is full, moving the evicted key
+        to its ghost list
+        """
+        if len(self.t1) + len(self.t2) < self.max_items:
+            return
+        if self.t1 and (len(self.t1) > self.p or (
+                key in self.b2 and len(self.t1) == self.p)):
+            discard_key = next(iter(self.t1))
+            self.discard(discard_key)
+            self.b1[discard_key] = None
+        else:
+            discard_key = next(iter(self.t2))
+            self.discard(discard_key)
+            self.b2[discard_key] = None
+
+    def pop(self, key):
+        """ Remove an item by key and return it
+        If key is None or if the key doesn’t exist, return None.
+        """
+        self.t1.pop(key, None)
+        self.t2.pop(key, None)
+        return super().pop(key)
+
+    def get(self, key):
+        """ Get an item by key
+        If key is None, if the key doesn’t exist or if it expired, return
+        None.
+        """
+        if key is None or key not in self.cache_data or self.expired(key):
+            return None
+        self.__hit(key)
+        return self.cache_data[key]
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+""" TwoQueueCache module
+"""
+
+from collections import OrderedDict
+
+from bounded_caching import BoundedCaching
+
+
+class TwoQueueCache(BoundedCaching):
+    """ TwoQueueCache defines:
+      - a caching system that follows the full 2Q algorithm (Johnson and
+        Shasha)
+
+    New keys enter the FIFO queue a1in. Keys evicted from it are remembered,
+    without their items, in the FIFO ghost queue a1out, and only a key put
+    again while in a1out is promoted to the LRU queue am. Keys used once,
+    such as those of a sequential scan, so never displace the keys of am.
+
+    Even the oldest key of a1out is promoted:
+
+    >>> cache = TwoQueueCache(max_items=4)
+    >>> for key in "abcdefg":
+    ...     cache.put(key, key)
+    >>> list(cache.a1out)
+    ['b', 'c']
+    >>> cache.put("b", "b")
+    >>> list(cache.am), list(cache.a1in), list(cache.a1out)
+    (['b'], ['e', 'f', 'g'], ['c', 'd'])
+    """
+    IN_RATIO = 0.25
+    OUT_RATIO = 0.5
+
+    def __init__(self, max_items=None, max_bytes=None, sizer=None):
+        """ Initialize
+        """
+        assert max_bytes is None, "TwoQueueCache is sized in items only."
+        super().__init__(max_items, max_bytes, sizer)
+        self.a1in = OrderedDict()
+        self.a1out = OrderedDict()
+        self.am = OrderedDict()
+        self.k_in = max(1, int(self.max_items * self.IN_RATIO))
+        self.k_out = max(1, int(self.max_items * self.OUT_RATIO))
+
+    def put(self, key, item, ttl=None):
+        """ Add an item in the cache
+        If key or item is None, this method should not do anything.
+        When the cache is full, discard the first item of a1in if it is
+        over its share, else the least recently used item of am.
+        If ttl is given, the item expires ttl seconds from now.
+        """
+        if key is None or item is None:
+            return
+        self.sweep(self.SWEEP_STEP)
+
+        if key in self.am:
+            self.am.move_to_end(key)
+        elif key in self.a1out:
+            # Taken out of a1out first, so that reclaiming cannot drop it.
+            del self.a1out[key]
+            self.__reclaim()
+            self.am[key] = None
+        elif key not in self.a1in:
+            self.__reclaim()
+            self.a1in[key] = None
+        self.cache_data[key] = item
+        self.set_ttl(key, ttl)
+
+    def __reclaim(self):
+        """ Evict an item if the cache is full
+        """
+        if len(self.cache_data) < self.max_items:
+            return
+        if len(self.a1in) > self.k_in or not self.am:
+            discard_key = next(iter(self.a1in))
+            self.discard(discard_key)
+            self.a1out[discard_key] = None
+            if len(self.a1out) > self.k_out:
+                self.a1out.popitem(last=False)
+        else:
+            self.discard(next(iter(self.am)))
+
+    def pop(self, key):
+        """ Remove an item by key and return it
+        If key is None or if the key doesn’t exist, return None.
+        """
+        self.a1in.pop(key, None)
+        self.am.pop(key, None)
+        return super().pop(key)
+
+    def get(self, key):
+        """ Get an item by key
+        If key is None, if the key doesn’t exist or if it expired, return
+        None.
+        """
+        if key is None or key not in self.cache_data or self.expired(key):
+            return None
+        if key in self.am:
+            self.am.move_to_end(key)
+        return self.cache_data[key]
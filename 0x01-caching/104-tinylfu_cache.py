@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+""" TinyLFUCache module
+"""
+
+from collections import OrderedDict
+
+from bounded_caching import BoundedCaching
+
+HALVE = bytes(count >> 1 for count in range(256))
+
+
+class CountMinSketch:
+    """ CountMinSketch defines:
+      - an approximate frequency counter of 4-bit counters in `depth` rows,
+        whose counts are all halved every `sample_size` increments so that
+        it follows the recent popularity of keys
+    """
+    SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F,
+             0x165667B19E3779F9, 0x85EBCA77C2B2AE63)
+    MAX_COUNT = 15
+
+    def __init__(self, width, sample_size, depth=4):
+        """ Initialize
+        width is rounded up to a power of 2, and to at least 16.
+        """
+        width = 1 << max(width - 1, 15).bit_length()
+        self.mask = width - 1
+        self.rows = [bytearray(width) for _ in range(depth)]
+        self.seeds = self.SEEDS[:depth]
+        self.sample_size = sample_size
+        self.additions = 0
+
+    def __indexes(self, key):
+        """ The counter of key in each row
+        """
+        h = hash(key)
+        for seed in self.seeds:
+            x = (h * seed) & 0xFFFFFFFFFFFFFFFF
+            yield (x ^ (x >> 32)) & self.mask
+
+    def increment(self, key):
+        """ Count one more use of key
+        """
+        for row, index in zip(self.rows, self.__indexes(key)):
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self.rows = [row.translate(HALVE) for row in self.rows]
+            self.additions //= 2
+
+    def estimate(self, key):
+        """ The estimated number of recent uses of key
+        """
+        return min(row[index]
+                   for row, index in zip(self.rows, self.__indexes(key)))
+
+
+class TinyLFUCache(BoundedCaching):
+    """ TinyLFUCache defines:
+      - a caching system that follows the W-TinyLFU algorithm (Einziger,
+        Friedman and Manes)
+
+    New keys enter a small LRU window. A key leaving the window only enters
+    the main segmented LRU (probation then protected) if a count-min sketch
+    of recent uses says it is used more often than the key it would evict,
+    so one-off keys such as those of a scan are rejected at the door.
+    """
+    WINDOW_RATIO = 0.01
+    PROTECTED_RATIO = 0.8
+
+    def __init__(self, max_items=None, max_bytes=None, sizer=None):
+        """ Initialize
+        """
+        assert max_bytes is None, "TinyLFUCache is sized in items only."
+        super().__init__(max_items, max_bytes, sizer)
+        self.window_size = max(1, int(self.max_items * self.WINDOW_RATIO))
+        main_size = self.max_items - self.window_size
+        self.protected_size = int(main_size * self.PROTECTED_RATIO)
+        self.main_size = main_size
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+        self.sketch = CountMinSketch(self.max_items, 10 * self.max_items)
+
+    def put(self, key, item, ttl=None):
+        """ Add an item in the cache
+        If key or item is None, this method should not do anything.
+        When the cache is full, discard either the key leaving the window or
+        the main key it competes with, whichever is used less.
+        If ttl is given, the item expires ttl seconds from now.
+        """
+        if key is None or item is None:
+            return
+        self.sweep(self.SWEEP_STEP)
+        self.sketch.increment(key)
+        if key in self.cache_data:
+            self.cache_data[key] = item
+            self.set_ttl(key, ttl)
+            self.__hit(key)
+            return
+
+        self.cache_data[key] = item
+        self.set_ttl(key, ttl)
+        self.window[key] = None
+        if len(self.window) <= self.window_size:
+            return
+        candidate = next(iter(self.window))
+        del self.window[candidate]
+        if len(self.probation) + len(self.protected) < self.main_size:
+            self.probation[candidate] = None
+            return
+        victim = next(iter(self.probation or self.protected), None)
+        if victim is not None and (self.sketch.estimate(candidate) >
+                                   self.sketch.estimate(victim)):
+            self.discard(victim)
+            self.probation[candidate] = None
+        else:
+            self.discard(candidate)
+
+    def __hit(self, key):
+        """ Record a use of a cached key
+        """
+        if key in self.window:
+            self.window.move_to_end(key)
+        elif key in self.protected:
+            self.protected.move_to_end(key)
+        else:
+            del self.probation[key]
+            self.protected[key] = None
+            if len(self.protected) > self.protected_size:
+                demoted, _ = self.protected.popitem(last=False)
+                self.probation[demoted] = None
+
+    def pop(self, key):
+        """ Remove an item by key and return it
+        If key is None or if the key doesn’t exist, return None.
+        """
+        self.window.pop(key, None)
+        self.probation.pop(key, None)
+        self.protected.pop(key, None)
+        return super().pop(key)
+
+    def get(self, key):
+        """ Get an item by key
+        If key is None, if the key doesn’t exist or if it expired, return
+        None.
+        """
+        if key is None:
+            return None
+        self.sketch.increment(key)
+        if key not in self.cache_data or self.expired(key):
+            return None
+        self.__hit(key)
+        return self.cache_data[key]
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+""" Benchmarks for the caching policies
+
+    ./bench_caching.py ops --sizes 4 1000 1000000
+    ./bench_caching.py threads --threads 1 2 4 8
+    ./bench_caching.py trace --size 1000 --length 200000
+"""
+
+import argparse
+import contextlib
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List
+
+POLICIES = {
+    "fifo": ('1-fifo_cache', 'FIFOCache'),
+    "lifo": ('2-lifo_cache', 'LIFOCache'),
+    "lru": ('3-lru_cache', 'LRUCache'),
+    "mru": ('4-mru_cache', 'MRUCache'),
+    "lfu": ('100-lfu_cache', 'LFUCache'),
+    "concurrent-lru": ('101-concurrent_cache', 'ConcurrentLRUCache'),
+    "concurrent-lfu": ('101-concurrent_cache', 'ConcurrentLFUCache'),
+    "arc": ('102-arc_cache', 'ARCCache'),
+    "2q": ('103-two_queue_cache', 'TwoQueueCache'),
+    "tinylfu": ('104-tinylfu_cache', 'TinyLFUCache'),
+}
+SINGLE_THREADED = ("fifo", "lifo", "lru", "mru", "lfu", "arc", "2q",
+                   "tinylfu")
+THREAD_SAFE = ("locked-lru", "concurrent-lru", "concurrent-lfu")
+
+
+def policy(name: str) -> type:
+    """
+    Get a cache class by name.
+
+    Args:
+        name (str): A key of `POLICIES`.
+
+    Returns:
+        type: The cache class.
+    """
+    module, cls = POLICIES[name]
+    return getattr(__import__(module), cls)
+
+
+def bench_ops(name: str, size: int, calls: int) -> Dict[str, float]:
+    """
+    Time calls on a full cache: gets and re-puts of keys it holds, then
+    puts of new keys, each one evicting an item.
+
+    Args:
+        name (str): A key of `POLICIES`.
+        size (int): The capacity of the cache.
+        calls (int): The number of calls of each kind to time.
+
+    Returns:
+        Dict[str, float]: The mean time of a "get" hit, of an "update" put
+            and of an "evict" put, in nanoseconds.
+    """
+    cache = policy(name)(max_items=size)
+    for key in range(size):
+        cache.put(key, key)
+    timings = {}
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            started = time.perf_counter_ns()
+            for i in range(calls):
+                cache.get(i % size)
+            timings['get'] = (time.perf_counter_ns() - started) / calls
+            started = time.perf_counter_ns()
+            for i in range(calls):
+                cache.put(i % size, i)
+            timings['update'] = (time.perf_counter_ns() - started) / calls
+            started = time.perf_counter_ns()
+            for key in range(size, size + calls):
+                cache.put(key, key)
+            timings['evict'] = (time.perf_counter_ns() - started) / calls
+    return timings
+
+
+class LockedCache:
+    """ A cache behind one global lock, the baseline for sharded caches
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            return self.cache.get(key)
+
+    def put(self, key, item):
+        with self.lock:
+            self.cache.put(key, item)
+
+
+def bench_threads(name: str, threads: int, calls: int, size: int,
+                  seed: int = 0) -> float:
+    """
+    Run `calls` skewed gets and puts (nine gets for each put) spread over
+    `threads` threads sharing one cache.
+
+    Args:
+        name (str): "locked-lru" or a key of `POLICIES`.
+        threads (int): The number of threads.
+        calls (int): The total number of calls.
+        size (int): The capacity of the cache; keys are drawn from twice
+            as many.
+        seed (int): The random seed of the keys (default is 0).
+
+    Returns:
+        float: The throughput, in calls per second.
+    """
+    if name == "locked-lru":
+        cache = LockedCache(policy("lru")(max_items=size))
+    else:
+        cache = policy(name)(max_items=size)
+    rng = random.Random(seed)
+    work = [[(int(rng.paretovariate(1.2)) % (2 * size), rng.random() < 0.1)
+             for _ in range(calls // threads)] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def run(calls):
+        barrier.wait()
+        for key, put in calls:
+            if put:
+                cache.put(key, key)
+            else:
+                cache.get(key)
+
+    workers = [threading.Thread(target=run, args=(calls,))
+               for calls in work]
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            for worker in workers:
+                worker.start()
+            barrier.wait()
+            started = time.perf_counter()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - started
+    return sum(map(len, work)) / elapsed
+
+
+def zipf(keys: int, length: int, rng: random.Random,
+         skew: float = 0.9) -> List[int]:
+    """
+    Draw `length` keys in [0, keys) from a Zipf distribution.
+
+    Args:
+        keys (int): The number of distinct keys.
+        length (int): The number of keys to draw.
+        rng (random.Random): The random generator.
+        skew (float): The Zipf exponent (default is 0.9).
+
+    Returns:
+        List[int]: The keys, key 0 being the most popular.
+    """
+    weights = itertools.accumulate(1 / (rank + 1) ** skew
+                                   for rank in range(keys))
+    return rng.choices(range(keys), cum_weights=list(weights), k=length)
+
+
+def make_trace(kind: str, size: int, length: int, seed: int = 0) -> List:
+    """
+    Build a synthetic access trace for a cache of `size` items.
+
+    Args:
+        kind (str): "zipf" (skewed reuse), "scan" (zipf interrupted by
+            bulk scans of keys used once), "loop" (a cycle over more keys
+            than fit) or "shift" (zipf whose popular keys change every
+            tenth of the trace).
+        size (int): The capacity of the cache.
+        length (int): The number of accesses.
+        seed (int): The random seed (default is 0).
+
+    Returns:
+        List: The keys accessed, in order.
+    """
+    rng = random.Random(seed)
+    keys = 10 * size
+    if kind == "zipf":
+        return zipf(keys, length, rng)
+    if kind == "scan":
+        trace = []
+        scanned = itertools.count(keys)
+        for _ in range(0, length, 7 * size):
+            trace.extend(zipf(keys, 5 * size, rng))
+            trace.extend(itertools.islice(scanned, 2 * size))
+        return trace[:length]
+    if kind == "loop":
+        return [i % (size + size // 2) for i in range(length)]
+    if kind == "shift":
+        trace = []
+        phase = max(1, length // 10)
+        for offset in range(0, length, phase):
+            trace.extend(key + offset for key in zipf(keys, phase, rng))
+        return trace[:length]
+    raise ValueError("Unknown trace kind: {}".format(kind))
+
+
+def hit_ratio(name: str, size: int, trace: Iterable) -> float:
+    """
+    Replay a trace through a cache, putting every key that misses.
+
+    Args:
+        name (str): A key of `POLICIES`.
+        size (int): The capacity of the cache.
+        trace (Iterable): The keys accessed, in order.
+
+    Returns:
+        float: The fraction of accesses that hit.
+    """
+    cache = policy(name)(max_items=size)
+    hits = accesses = 0
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            for key in trace:
+                accesses += 1
+                if cache.get(key) is None:
+                    cache.put(key, True)
+                else:
+                    hits += 1
+    return hits / accesses if accesses else 0.0
+
+
+def main(argv: List[str] = None) -> None:
+    """ Command line entry point
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    commands = parser.add_subparsers(dest='command', required=True)
+    ops = commands.add_parser('ops', help="time get and put per cache size")
+    ops.add_argument('--policies', nargs='+', default=list(POLICIES),
+                     choices=list(POLICIES))
+    ops.add_argument('--sizes', type=int, nargs='+',
+                     default=[4, 100, 10000, 1000000])
+    ops.add_argument('--calls', type=int, default=100000)
+    threaded = commands.add_parser(
+        'threads', help="time thread-safe caches per thread count")
+    threaded.add_argument('--policies', nargs='+', default=list(THREAD_SAFE),
+                          choices=list(THREAD_SAFE))
+    threaded.add_argument('--threads', type=int, nargs='+',
+                          default=[1, 2, 4, 8])
+    threaded.add_argument('--size', type=int, default=10000)
+    threaded.add_argument('--calls', type=int, default=400000)
+    traced = commands.add_parser('trace', help="compare hit ratios")
+    traced.add_argument('--policies', nargs='+',
+                        default=list(SINGLE_THREADED),
+                        choices=list(SINGLE_THREADED))
+    traced.add_argument('--traces', nargs='+',
+                        default=["zipf", "scan", "loop", "shift"],
+                        choices=["zipf", "scan", "loop", "shift"])
+    traced.add_argument('--file', help="a trace file, one key per line")
+    traced.add_argument('--size', type=int, default=1000)
+    traced.add_argument('--length', type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    if args.command == 'trace':
+        if args.file:
+            with open(args.file) as f:
+                traces = {os.path.basename(args.file):
+                          [line.strip() for line in f]}
+        else:
+            traces = {kind: make_trace(kind, args.size, args.length)
+                      for kind in args.traces}
+        print("{:>8}".format("policy") + "".join(
+            "{:>10}".format(kind) for kind in traces))
+        for name in args.policies:
+            print("{:>8}".format(name) + "".join(
+                "{:>9.1%} ".format(hit_ratio(name, args.size, trace))
+                for trace in traces.values()))
+        return
+
+    if args.command == 'threads':
+        print("{:>15}".format("threads") + "".join(
+            "{:>10}".format(count) for count in args.threads))
+        for name in args.policies:
+            print("{:>15}".format(name) + "".join(
+                "{:>8.0f}k/s".format(bench_threads(
+                    name, count, args.calls, args.size) / 1000)
+                for count in args.threads))
+        return
+
+    print("{:>8} {:>8}".format("policy", "size") + "".join(
+        "{:>12}".format(kind) for kind in ("get", "update", "evict")))
+    for name in args.policies:
+        for size in args.sizes:
+            timings = bench_ops(name, size, args.calls)
+            print("{:>8} {:>8}".format(name, size) + "".join(
+                "{:>10.0f}ns".format(timing) for timing in timings.values()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
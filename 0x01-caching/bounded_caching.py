@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+""" BoundedCaching module
+"""
+
+import heapq
+import itertools
+import sys
+import time
+
+from base_caching import BaseCaching
+from eviction_listeners import CAPACITY, EXPIRED
+
+
+class BoundedCaching(BaseCaching):
+    """ BoundedCaching defines:
+      - the capacity of a caching system, set per instance as a maximum
+        number of items, a maximum total size of the items in bytes, or both
+      - the bookkeeping shared by the eviction policies
+      - the expiry of items put with a time to live
+      - the reporting of evictions to a listener
+
+    Without any limit given, a cache holds up to MAX_ITEMS items.
+
+    An expired item is removed when it is next looked up, or by sweep(),
+    which every put calls to reclaim up to SWEEP_STEP expired items in
+    deadline order. Items evicted for capacity are counted in evictions,
+    expired ones in expirations.
+
+    Each evicted item is passed to on_evict(key, item, reason), if set, with
+    reason CAPACITY or EXPIRED (see eviction_listeners). Nothing is printed.
+    """
+    SWEEP_STEP = 4
+
+    def __init__(self, max_items=None, max_bytes=None, sizer=None):
+        """ Initialize
+        max_bytes bounds the sum of sizer(item) over the cached items, where
+        sizer defaults to sys.getsizeof.
+        """
+        super().__init__()
+        if max_items is None and max_bytes is None:
+            max_items = self.MAX_ITEMS
+        assert max_items is None or (
+            isinstance(max_items, int) and max_items > 0), (
+            "max_items must be an integer greater than 0.")
+        assert max_bytes is None or (
+            isinstance(max_bytes, int) and max_bytes > 0), (
+            "max_bytes must be an integer greater than 0.")
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.sizer = sizer or sys.getsizeof
+        self.sizes = {}
+        self.used_bytes = 0
+        self.clock = time.monotonic
+        self.expires = {}
+        self.expiry_heap = []
+        self.expiry_order = itertools.count()
+        self.evictions = 0
+        self.expirations = 0
+        self.on_evict = None
+
+    def charge(self, key, item):
+        """ Account for item being stored under key
+        Return False, accounting nothing, if the item alone is larger than
+        max_bytes and so can never be cached.
+        """
+        if self.max_bytes is None:
+            return True
+        size = self.sizer(item)
+        if size > self.max_bytes:
+            return False
+        self.used_bytes += size - self.sizes.get(key, 0)
+        self.sizes[key] = size
+        return True
+
+    def release(self, key):
+        """ Stop accounting for the item stored under key
+        """
+        if self.max_bytes is not None:
+            self.used_bytes -= self.sizes.pop(key, 0)
+        if self.expires:
+            self.expires.pop(key, None)
+
+    def set_ttl(self, key, ttl):
+        """ Make the item under key expire ttl seconds from now
+        If ttl is None, the item never expires.
+        """
+        if ttl is None:
+            if self.expires:
+                self.expires.pop(key, None)
+            return
+        entry = (self.clock() + ttl, next(self.expiry_order), key)
+        self.expires[key] = entry
+        heapq.heappush(self.expiry_heap, entry)
+        # Replaced entries stay in the heap until popped: rebuild it before
+        # they outnumber the live ones.
+        if len(self.expiry_heap) > 2 * len(self.expires) + 64:
+            self.expiry_heap = [entry for entry in self.expiry_heap
+                                if self.expires.get(entry[2]) is entry]
+            heapq.heapify(self.expiry_heap)
+
+    def expired(self, key):
+        """ Whether the item under key has expired, removing it if so
+        """
+        entry = self.expires.get(key)
+        if entry is None or entry[0] > self.clock():
+            return False
+        self.discard(key, EXPIRED)
+        return True
+
+    def sweep(self, limit=None):
+        """ Remove expired items, earliest deadline first
+        Look at no more than limit deadlines (all of them if limit is None)
+        and return the number of items removed.
+        """
+        heap = self.expiry_heap
+        if not heap:
+            return 0
+        now = self.clock()
+        removed = 0
+        while heap and heap[0][0] <= now and limit != 0:
+            entry = heapq.heappop(heap)
+            if limit is not None:
+                limit -= 1
+            key = entry[2]
+            if self.expires.get(key) is entry:
+                self.discard(key, EXPIRED)
+                removed += 1
+        return removed
+
+    def over_budget(self):
+        """ Whether items must be evicted to respect the capacity
+        """
+        if self.max_items is not None and (
+                len(self.cache_data) > self.max_items):
+            return True
+        return self.max_bytes is not None and self.used_bytes > self.max_bytes
+
+    def pop(self, key):
+        """ Remove an item by key and return it
+        If key is None or if the key doesn’t exist, return None.
+        """
+        if key is None or key not in self.cache_data:
+            return None
+        self.release(key)
+        return self.cache_data.pop(key)
+
+    def discard(self, key, reason=CAPACITY):
+        """ Evict an item by key and report it to on_evict
+        """
+        item = self.pop(key)
+        if reason == EXPIRED:
+            self.expirations += 1
+        else:
+            self.evictions += 1
+        if self.on_evict is not None:
+            self.on_evict(key, item, reason)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+""" Eviction listeners module
+
+A listener is set as the on_evict attribute of a cache, and called as
+on_evict(key, item, reason) for every item the cache evicts, where reason
+is CAPACITY or EXPIRED.
+"""
+
+import collections
+import sys
+import threading
+
+CAPACITY = "capacity"
+EXPIRED = "expired"
+
+
+def print_discard(key, item, reason):
+    """ Print DISCARD and the key of the evicted item, as the caches used to
+    """
+    print("DISCARD: {}".format(key))
+
+
+def write_back(store):
+    """ A listener saving the items evicted for capacity into store
+    store is any mapping, such as a dict or a shelf, or a slower cache.
+    Expired items are dropped, as they are out of date.
+    """
+    def on_evict(key, item, reason):
+        """ Save item into store unless it expired
+        """
+        if reason == CAPACITY:
+            store[key] = item
+    return on_evict
+
+
+class EvictionLog:
+    """ EvictionLog defines:
+      - a listener that logs evictions from a background thread, so that
+        an eviction only costs an append to a queue
+
+    Records are written in batches, at least every `interval` seconds and
+    as soon as `batch_size` of them are waiting. close() writes the records
+    left and stops the thread.
+    """
+
+    def __init__(self, stream=None, interval=1.0, batch_size=1024):
+        """ Initialize
+        stream defaults to sys.stdout.
+        """
+        assert interval > 0, "interval must be greater than 0."
+        assert isinstance(batch_size, int) and batch_size > 0, (
+            "batch_size must be an integer greater than 0.")
+        self.stream = stream or sys.stdout
+        self.interval = interval
+        self.batch_size = batch_size
+        self.records = collections.deque()
+        self.wakeup = threading.Event()
+        self.closed = False
+        self.thread = threading.Thread(target=self.__run, daemon=True)
+        self.thread.start()
+
+    def __call__(self, key, item, reason):
+        """ Queue the eviction of key, the item is not kept
+        """
+        self.records.append((key, reason))
+        if len(self.records) >= self.batch_size:
+            self.wakeup.set()
+
+    def __run(self):
+        """ Write the queued records until closed
+        """
+        while not self.closed:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """ Write the queued records
+        """
+        records = self.records
+        lines = []
+        # popleft is atomic, so evictions may be queued meanwhile.
+        while records:
+            key, reason = records.popleft()
+            lines.append("DISCARD: {} ({})\n".format(key, reason))
+        if lines:
+            self.stream.write("".join(lines))
+            self.stream.flush()
+
+    def close(self):
+        """ Write the records left and stop the thread
+        """
+        self.closed = True
+        self.wakeup.set()
+        self.thread.join()
+        self.flush()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+""" Memoization module
+"""
+
+import functools
+import threading
+from collections import namedtuple
+
+LRUCache = __import__('3-lru_cache').LRUCache
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions",
+                                     "expirations", "capacity", "size"])
+
+KWARGS_MARK = object()
+FAST_TYPES = {int, str}
+
+
+def make_key(args, kwargs):
+    """ A hashable key for a call with args and kwargs
+    A single int or str argument is its own key; other calls are keyed by
+    the flat tuple of their arguments, keyword names included.
+    """
+    if kwargs:
+        key = args + (KWARGS_MARK,)
+        for item in kwargs.items():
+            key += item
+        return key
+    if len(args) == 1 and type(args[0]) in FAST_TYPES:
+        return args[0]
+    return args
+
+
+class Flight:
+    """ Flight defines:
+      - a computation in progress, that the callers missing on the same key
+        wait for instead of starting their own
+    """
+
+    def __init__(self):
+        """ Initialize
+        """
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def cached(policy=LRUCache, capacity=None, ttl=None):
+    """ Memoize a function in a cache of the policy class
+
+    Args:
+        policy: a BoundedCaching policy, such as LRUCache or LFUCache.
+        capacity: the maximum number of results kept, MAX_ITEMS if None.
+        ttl: how long, in seconds, a result is kept, forever if None.
+
+    Returns:
+        A decorator. The wrapped function keeps its cache in `cache`, and
+        has `cache_info()` and `cache_clear()` methods.
+
+    The arguments of the function must be hashable. Concurrent calls that
+    miss on the same key share one computation, whose error, if it raises,
+    is raised in every one of them; callers that wait for it count as
+    hits. A function that raises is never cached.
+    """
+    def decorator(function):
+        lock = threading.Lock()
+        flights = {}
+        stats = {"hits": 0, "misses": 0}
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            with lock:
+                # Results are cached wrapped in a tuple, so that a function
+                # returning None is not taken for a miss.
+                entry = wrapper.cache.get(key)
+                if entry is not None:
+                    stats["hits"] += 1
+                    return entry[0]
+                flight = flights.get(key)
+                if flight is None:
+                    stats["misses"] += 1
+                    flight = flights[key] = Flight()
+                    leader = True
+                else:
+                    stats["hits"] += 1
+                    leader = False
+
+            if not leader:
+                flight.done.wait()
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result
+
+            try:
+                flight.result = function(*args, **kwargs)
+            except BaseException as error:
+                flight.error = error
+                raise
+            else:
+                with lock:
+                    wrapper.cache.put(key, (flight.result,), ttl)
+                return flight.result
+            finally:
+                with lock:
+                    del flights[key]
+                flight.done.set()
+
+        def cache_info():
+            """ The statistics of the cache, as a CacheInfo
+            """
+            with lock:
+                cache = wrapper.cache
+                return CacheInfo(stats["hits"], stats["misses"],
+                                 cache.evictions, cache.expirations,
+                                 cache.max_items, len(cache.cache_data))
+
+        def cache_clear():
+            """ Empty the cache and reset its statistics
+            """
+            with lock:
+                wrapper.cache = policy(max_items=capacity)
+                stats["hits"] = stats["misses"] = 0
+
+        wrapper.cache = policy(max_items=capacity)
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator